@@ -3,15 +3,23 @@
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl)
 """Provide the :class:`DB` class to manage the server databases."""
 import base64
+import collections
 import io
+import shutil
 import sys
+import threading
+import time
+import uuid
+from multiprocessing.pool import ThreadPool
 
-from odoorpc import error
+from odoorpc import error, rpc
 from odoorpc.tools import v
 from odoorpc.rpc.jsonrpclib import Secret, Bloat
 
 # Python 2
 if sys.version_info[0] < 3:
+    from Queue import Empty, Queue
+    from urllib import urlencode
 
     def encode2bytes(data):
         return data
@@ -19,11 +27,23 @@ if sys.version_info[0] < 3:
 
 # Python >= 3
 else:
+    from queue import Empty, Queue
+    from urllib.parse import urlencode
 
     def encode2bytes(data):
         return bytes(data, "ascii")
 
 
+DBOperation = collections.namedtuple(
+    "DBOperation", ["db", "result", "error", "duration"]
+)
+DBOperation.__doc__ = """Result of an operation on the `db` database performed
+by :func:`DB.dump_many`, :func:`DB.duplicate_many` or :func:`DB.drop_many`:
+its `result`, the `error` raised if it failed (`None` otherwise), and its
+`duration` in seconds.
+"""
+
+
 class DB(object):
     """The `DB` class represents the database management service.
     It provides functionalities such as list, create, drop, dump
@@ -217,9 +237,14 @@ class DB(object):
         if self._odoo._env and self._odoo._env.db == db:
             # Remove the existing session to avoid HTTP session error
             self._odoo.logout()
-        data = self._odoo.json(
+        return self._drop(password, db)
+
+    def _drop(self, password, db, connector=None):
+        """Drop the `db` database with `connector` (see :func:`drop`)."""
+        data = self._odoo._json(
             "/jsonrpc",
             {"service": "db", "method": "drop", "args": [Secret(password), db]},
+            connector or self._odoo._connector,
         )
         return data["result"]
 
@@ -245,18 +270,203 @@ class DB(object):
         :raise: :class:`odoorpc.error.RPCError` (access denied / wrong database)
         :raise: `urllib.error.URLError` (connection error)
         """
+        self._duplicate(password, db, new_db, neutralize_database)
+
+    def _duplicate(
+        self, password, db, new_db, neutralize_database=False, connector=None
+    ):
+        """Duplicate `db` as `new_db` with `connector` (see :func:`duplicate`)."""
         args = [Secret(password), db, new_db]
         # neutralize_database parameter is only available from Odoo 16+
         if neutralize_database and v(self._odoo.version)[0] >= 16:
             args.append(neutralize_database)
-        self._odoo.json(
+        self._odoo._json(
             "/jsonrpc",
             {
                 "service": "db",
                 "method": "duplicate_database",
                 "args": args,
             },
+            connector or self._odoo._connector,
+        )
+
+    def dump_many(self, password, dbs, path, format_="zip", workers=4, timeout=None):
+        """Backup each database of `dbs` in its own file, located at `path`
+        formatted with the name of the database (e.g. ``'/backups/{db}.zip'``).
+        Dumps are performed concurrently, at most `workers` at a time, and
+        each one is written to its file while it is received (on
+        `Odoo >= 9.0`):
+
+        .. doctest::
+            :options: +SKIP
+
+            >>> for op in odoo.db.dump_many(
+            ...         'super_admin_passwd', ['prod1', 'prod2'],
+            ...         '/backups/{db}.zip', timeout=3600):
+            ...     print(op.db, op.result, op.error)
+            ...
+            prod1 /backups/prod1.zip None
+            prod2 /backups/prod2.zip None
+
+        `timeout` is the maximum timeout in seconds of each request, the
+        ``timeout`` option (see :attr:`odoorpc.ODOO.config`) being used if
+        it is not set.
+
+        Errors do not stop the other operations: a
+        :class:`DBOperation <odoorpc.db.DBOperation>` is returned for each
+        database, in the order of `dbs`, with the path of the dump as
+        `result`. The super administrator password is required to perform
+        this method.
+        """
+
+        def dump(db, connector):
+            # Odoo >= 9.0: the dump is streamed by the HTTP route
+            if v(self._odoo.version)[0] >= 9:
+                data = Secret(
+                    urlencode(
+                        {"master_pwd": password, "name": db, "backup_format": format_}
+                    )
+                )
+                response = connector.proxy_http("web/database/backup", data)
+                try:
+                    content_type = response.info().get("Content-Type") or ""
+                    # An error page is returned if the backup failed
+                    if content_type.startswith("text/html"):
+                        raise error.RPCError("The dump of '%s' failed." % db)
+                    with open(path.format(db=db), "wb") as file_:
+                        shutil.copyfileobj(response, file_)
+                finally:
+                    response.close()
+            else:
+                args = [Secret(password), db]
+                data = self._odoo._json(
+                    "/jsonrpc",
+                    {"service": "db", "method": "dump", "args": args},
+                    connector,
+                )
+                content = base64.standard_b64decode(encode2bytes(data["result"]))
+                with open(path.format(db=db), "wb") as file_:
+                    file_.write(content)
+            return path.format(db=db)
+
+        return self._run_many(dump, [(db,) for db in dbs], workers, timeout)
+
+    def duplicate_many(
+        self, password, dbs, neutralize_database=False, workers=4, timeout=None
+    ):
+        """Duplicate databases concurrently, at most `workers` at a time.
+        `dbs` is a list of ``(db, new_db)`` tuples (or a dictionary):
+
+        .. doctest::
+            :options: +SKIP
+
+            >>> odoo.db.duplicate_many(
+            ...     'super_admin_passwd',
+            ...     [('template', 'test1'), ('template', 'test2')])
+            [DBOperation(db='template', result=None, error=None, duration=...),
+             DBOperation(db='template', result=None, error=None, duration=...)]
+
+        See :func:`duplicate` for `neutralize_database`, and
+        :func:`dump_many` for `timeout` and the results.
+        """
+
+        def duplicate(db, new_db, connector):
+            self._duplicate(password, db, new_db, neutralize_database, connector)
+
+        if isinstance(dbs, dict):
+            dbs = dbs.items()
+        return self._run_many(duplicate, list(dbs), workers, timeout)
+
+    def drop_many(self, password, dbs, workers=4, timeout=None):
+        """Drop the databases `dbs` concurrently, at most `workers` at a time.
+        The result of each operation is `True` if the database was removed,
+        `False` otherwise (see :func:`drop`):
+
+        .. doctest::
+            :options: +SKIP
+
+            >>> [op.result for op in odoo.db.drop_many(
+            ...     'super_admin_passwd', ['test1', 'test2'])]
+            [True, True]
+
+        See :func:`dump_many` for `timeout` and the results.
+        """
+        if self._odoo._env and self._odoo._env.db in dbs:
+            # Remove the existing session to avoid HTTP session error
+            self._odoo.logout()
+
+        def drop(db, connector):
+            return self._drop(password, db, connector)
+
+        return self._run_many(drop, [(db,) for db in dbs], workers, timeout)
+
+    def template_pool(self, password, template, size=2, prefix=None, timeout=None):
+        """Return a :class:`TemplatePool` keeping `size` copies of the
+        `template` database ready to be used (e.g. by test cases), the
+        copies being duplicated in the background:
+
+        .. doctest::
+            :options: +SKIP
+
+            >>> pool = odoo.db.template_pool('super_admin_passwd', 'template')
+            >>> db = pool.acquire()
+            >>> odoo.login(db, 'admin', 'admin')
+            >>> # ...
+            >>> pool.release(db)
+            >>> pool.close()
+
+        Copies are named with `prefix` (``'<template>_pool_'`` by default)
+        followed by a unique suffix. `timeout` is the maximum timeout in
+        seconds of each duplication (see :func:`dump_many`).
+        The super administrator password is required to perform this method.
+        """
+        return TemplatePool(self, password, template, size, prefix, timeout)
+
+    def _run_many(self, operation, args_list, workers, timeout):
+        """Call ``operation(*args, connector)`` for each `args` of `args_list`
+        on a pool of `workers` threads, and return the list of
+        :class:`DBOperation` (the first argument being the database name).
+        """
+
+        def run(args):
+            start = time.time()
+            result = exc = None
+            try:
+                result = operation(*(tuple(args) + (self._get_connector(timeout),)))
+            except Exception as exc_:
+                exc = exc_
+            return DBOperation(args[0], result, exc, time.time() - start)
+
+        if not args_list:
+            return []
+        pool = ThreadPool(max(1, min(workers, len(args_list))))
+        try:
+            return pool.map(run, args_list)
+        finally:
+            pool.close()
+            pool.join()
+
+    def _get_connector(self, timeout=None):
+        """Return the connector to use for an operation with a `timeout`:
+        a new one if it differs from the global ``timeout`` option, so that
+        other requests are not affected.
+        """
+        connector = self._odoo._connector
+        if timeout is None or timeout == connector.timeout:
+            return connector
+        if not isinstance(connector, rpc.Connector):
+            # Custom connectors (cassettes...) keep their own timeout
+            return connector
+        kwargs = {}
+        # Keep the URL opener supplied by the user (authentication in front
+        # of Odoo...), the default one is replaced with its cookies
+        if getattr(connector, "_cookie_jar", None) is None:
+            kwargs["opener"] = getattr(connector, "_opener", None)
+        new_connector = type(connector)(
+            connector.host, connector.port, timeout, connector.version, **kwargs
         )
+        new_connector.retry = connector.retry
+        return new_connector
 
     def list(self):
         """Return the list of the databases:
@@ -322,3 +532,124 @@ class DB(object):
                 "args": [Secret(password), db, Bloat(b64_data), copy],
             },
         )
+
+
+class TemplatePool(object):
+    """Pool of copies of a `template` database, duplicated in the background
+    so that `size` of them are always ready to be acquired. Use
+    :func:`DB.template_pool` to get one.
+
+    Each copy is handed out once by :func:`acquire`, and dropped when
+    released (:func:`release`) as it has likely been modified. Copies
+    remaining in the pool are dropped by :func:`close`, which is also
+    called when leaving the ``with`` statement:
+
+    .. doctest::
+        :options: +SKIP
+
+        >>> with odoo.db.template_pool('super_admin_passwd', 'template') as pool:
+        ...     db = pool.acquire()
+        ...     odoo.login(db, 'admin', 'admin')
+        ...     # ...
+        ...     odoo.logout()
+        ...     pool.release(db)
+        ...
+    """
+
+    def __init__(self, db, password, template, size=2, prefix=None, timeout=None):
+        self._db = db
+        self._password = password
+        self.template = template
+        self.size = size
+        self.prefix = prefix or "%s_pool_" % template
+        self.timeout = timeout
+        self._ready = Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._acquired = set()
+        self._closed = False
+        for _i in range(size):
+            self._fill()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _fill(self):
+        """Duplicate the template in a new database in the background, and
+        make it available once done.
+        """
+        thread = threading.Thread(target=self._duplicate)
+        thread.daemon = True
+        with self._lock:
+            if self._closed:
+                return
+            self._threads = [thread_ for thread_ in self._threads if thread_.is_alive()]
+            self._threads.append(thread)
+            thread.start()
+
+    def _duplicate(self):
+        new_db = "%s%s" % (self.prefix, uuid.uuid4().hex[:12])
+        try:
+            connector = self._db._get_connector(self.timeout)
+            self._db._duplicate(
+                self._password, self.template, new_db, connector=connector
+            )
+        except Exception as exc:
+            # Raised by the call to `acquire` waiting for this database
+            self._ready.put(exc)
+        else:
+            self._ready.put(new_db)
+
+    def acquire(self, timeout=None):
+        """Return the name of a copy of the template, waiting at most
+        `timeout` seconds for one to be ready (indefinitely by default).
+        Another copy is duplicated in the background to replace it.
+
+        :raise: :class:`odoorpc.error.InternalError` (pool closed, no copy
+            ready in time)
+        :raise: :class:`odoorpc.error.RPCError` (the duplication failed)
+        """
+        if self._closed:
+            raise error.InternalError("The template pool is closed")
+        try:
+            db = self._ready.get(timeout=timeout)
+        except Empty:
+            raise error.InternalError(
+                "No copy of '%s' ready after %s seconds" % (self.template, timeout)
+            )
+        self._fill()
+        if isinstance(db, Exception):
+            raise db
+        with self._lock:
+            self._acquired.add(db)
+        return db
+
+    def release(self, db):
+        """Drop the `db` copy acquired from the pool."""
+        with self._lock:
+            self._acquired.discard(db)
+        self._db._drop(self._password, db, self._db._get_connector(self.timeout))
+
+    def close(self):
+        """Wait for the pending duplications, then drop the copies which
+        are still in the pool or have not been released.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            threads = list(self._threads)
+        for thread in threads:
+            thread.join()
+        dbs = []
+        while not self._ready.empty():
+            db = self._ready.get()
+            if not isinstance(db, Exception):
+                dbs.append(db)
+        with self._lock:
+            dbs.extend(self._acquired)
+            self._acquired.clear()
+        self._db.drop_many(self._password, dbs, timeout=self.timeout)
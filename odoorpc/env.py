@@ -3,15 +3,87 @@
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl)
 """Supply the :class:`Environment` class to manage records more efficiently."""
 
+import atexit
+import json
 import sys
+import threading
+import time
 import weakref
+from collections import OrderedDict
 
 from odoorpc import fields
 from odoorpc.models import Model
-from odoorpc.tools import v
 
 FIELDS_RESERVED = ["id", "ids", "__odoo__", "__osv__", "__data__", "env"]
 
+_MISSING = object()
+
+# Environments having records updated in 'deferred' mode, written at exit
+_DEFERRED_ENVS = weakref.WeakSet()
+
+
+def _flush_deferred_at_exit():
+    """Write the records updated with the ``auto_commit`` option set to
+    ``'deferred'`` before the interpreter exits.
+    """
+    errors = []
+    for env in list(_DEFERRED_ENVS):
+        try:
+            env._flush_deferred()
+            env._raise_deferred_error()
+        except Exception as exc:
+            errors.append(exc)
+    if errors:
+        raise errors[0]
+
+
+atexit.register(_flush_deferred_at_exit)
+
+
+def _dumps(value):
+    """Serialize `value` to group records having the same values to write."""
+    return json.dumps(value, sort_keys=True, default=repr)
+
+
+class Registry(dict):
+    """Mapping ``{model: class}`` of the model classes generated, with the
+    lock used to generate each class only once.
+    """
+
+    def __init__(self):
+        super(Registry, self).__init__()
+        self.lock = threading.RLock()
+
+
+class DirtyRecords(threading.local):
+    """Records updated locally, tracked separately by each thread so that
+    threads sharing the same environment only commit their own changes.
+    """
+
+    def __init__(self):
+        self.records = weakref.WeakSet()
+
+
+class DeferredRecords(object):
+    """Records updated locally with the ``auto_commit`` option set to
+    ``'deferred'``, shared by all threads until they are written
+    (see :func:`Environment.commit`).
+    """
+
+    def __init__(self):
+        self.error = None  # error raised while writing in the background
+        self.reset()
+
+    def reset(self):
+        """Replace the locks inherited from the parent process after a fork.
+        Records are left to the parent process, which writes them.
+        """
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.thread = None
+        self.records = OrderedDict()  # {record: None} by order of change
+        self.since = None  # time of the oldest change not written
+
 
 class Environment(object):
     """An environment wraps data like the user ID, context or current database
@@ -31,6 +103,17 @@ class Environment(object):
 
         >>> odoo.env
         Environment(db=..., uid=..., context=...)
+
+    An environment can be used by several threads: model classes are
+    generated only once, and records updated locally are tracked by thread
+    (see :attr:`dirty`). Records themselves are not protected, a recordset
+    should not be updated by several threads at the same time.
+
+    Environments, model classes and records can be pickled (e.g. to be sent
+    to the workers of a process pool). Only the context, model names and IDs
+    are serialized, along with the connection parameters and the session of
+    the :class:`ODOO <odoorpc.ODOO>` instance (see its documentation).
+    Values not committed are lost.
     """
 
     def __init__(self, odoo, db, uid, context):
@@ -38,14 +121,30 @@ class Environment(object):
         self._db = db
         self._uid = uid
         self._context = context
-        self._registry = {}
-        self._dirty = weakref.WeakSet()  # set of records updated locally
+        self._registry = Registry()
+        self._dirty = DirtyRecords()  # set of records updated locally
+        self._xmlids = {}  # {xml_id: (model, ID)} resolved
+        self._stats = {"writes_avoided": 0}
+        self._deferred = DeferredRecords()
 
     def __repr__(self):
         return "Environment(db={}, uid={}, context={})".format(
             repr(self._db), self._uid, self._context
         )
 
+    def __reduce__(self):
+        # Only the context is serialized, the user session is restored with
+        # the `ODOO` instance
+        return _restore_env, (self._odoo, self._context)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *args):
+        # Changes made by a block which failed are not committed
+        if exc_type is None:
+            self.commit()
+
     @property
     def dirty(self):
         """
@@ -54,11 +153,11 @@ class Environment(object):
             This property is used internally and should not be used directly.
             As such, it should not be referenced in the user documentation.
 
-        List records having local changes.
+        List records having local changes in the current thread.
         These changes can be committed to the server with the :func:`commit`
         method, or invalidated with :func:`invalidate`.
         """
-        return self._dirty
+        return self._dirty.records
 
     @property
     def context(self):
@@ -98,10 +197,11 @@ class Environment(object):
         return self._db
 
     def commit(self):
-        """Commit dirty records to the server. This method is automatically
-        called when the `auto_commit` option is set to `True` (default).
-        It can be useful to set the former option to `False` to get better
-        performance by reducing the number of RPC requests generated.
+        """Commit dirty records (updated by the current thread) to the
+        server. This method is automatically called when the `auto_commit`
+        option is set to `True` (default). It can be useful to set the former
+        option to `False` to get better performance by reducing the number
+        of RPC requests generated.
 
         With `auto_commit` set to `True` (default behaviour), each time a value
         is set on a record field a RPC request is sent to the server to update
@@ -129,26 +229,215 @@ class Environment(object):
             False
 
         Only one RPC request is generated in the last case.
+
+        With `auto_commit` set to ``'deferred'``, changes made by all threads
+        are kept until ``commit_size`` records have been updated or the
+        oldest change is ``commit_delay`` seconds old (see
+        :attr:`odoorpc.ODOO.config`), and are then written all at once.
+        Remaining changes are written when calling :func:`commit`, when
+        leaving the ``with`` statement on the environment without error, or
+        when the interpreter exits:
+
+        .. doctest::
+            :options: +SKIP
+
+            >>> odoo.config['auto_commit'] = 'deferred'
+            >>> with odoo.env as env:
+            ...     for partner in env['res.partner'].browse(partner_ids):
+            ...         partner.active = False
+            ...
+
+        If the ``commit_thread`` option is set to `True`, changes older than
+        ``commit_delay`` seconds are written by a background thread. An error
+        raised by this thread is raised again by the next change made in
+        ``'deferred'`` mode or call to :func:`commit`. Changes which could
+        not be written are kept to be written later, call :func:`invalidate`
+        to drop them (e.g. after an error in the ``with`` statement).
+
+        Records of the same model having the same values to write are updated
+        by one request. Values equal to the ones read from the server are not
+        written, and no request at all is sent for a record if none of its
+        values changed (see :attr:`writes_avoided`).
         """
+        self._flush_deferred()
         # Iterate on a new set, as we remove record during iteration from the
         # original one
-        for record in set(self.dirty):
+        self._commit_records(set(self.dirty))
+        self._raise_deferred_error()
+
+    def _commit_records(self, records, restore=False):
+        """Write the values not committed of `records`, with one request by
+        model, context and values to write.
+
+        Records are written in their order if `records` is ordered. If
+        `restore` is set (``'deferred'`` mode), the records which could
+        not be written because of an error are kept with their values to be
+        written later.
+        """
+        groups = []  # [(record, [records], values)]
+        last_groups = {}  # {key: index of the last group}
+        # Index of the group writing each record, so that records sharing
+        # an ID are written in the order of `records`
+        written_by = {}  # {(model, ID): index}
+        for record in records:
             values = {}
-            for field in record._values_to_write:
-                if record.id in record._values_to_write[field]:
-                    value = record._values_to_write[field].pop(record.id)
-                    values[field] = value
-                    # Store the value in the '_values' dictionary. This
-                    # operation is delegated to each field descriptor as some
-                    # values can not be stored "as is" (e.g. magic tuples of
-                    # 2many fields need to be converted)
-                    record.__class__.__dict__[field].store(record, value)
-            record.write(values)
-            self.dirty.remove(record)
+            # Iterate on a copy, as fields can be updated by another thread
+            # in 'deferred' mode
+            for field, field_values in list(record._values_to_write.items()):
+                value = field_values.pop(record.id, _MISSING)
+                if value is _MISSING:
+                    continue
+                if record._columns[field].unchanged(record, value):
+                    continue
+                values[field] = value
+            if not values:
+                with self._registry.lock:
+                    self._stats["writes_avoided"] += 1
+                self.dirty.discard(record)
+                record._values_to_write.records.discard(record)
+                continue
+            key = (record._name, _dumps(record.env.context), _dumps(values))
+            index = last_groups.get(key)
+            if index is None or index < written_by.get((record._name, record.id), -1):
+                index = last_groups[key] = len(groups)
+                groups.append((record, [], values))
+            groups[index][1].append(record)
+            written_by[(record._name, record.id)] = index
+        for index, (record, group, values) in enumerate(groups):
+            ids = [record_.id for record_ in group]
+            try:
+                record._browse(record.env, ids, iterated=record).write(values)
+            except Exception:
+                if restore:
+                    self._restore_deferred(groups[index:])
+                raise
+            for record_ in group:
+                # Store the value in the '_values' dictionary. This
+                # operation is delegated to each field descriptor as some
+                # values can not be stored "as is" (e.g. magic tuples of
+                # 2many fields need to be converted)
+                for field, value in values.items():
+                    record_._columns[field].store(record_, value)
+                self.dirty.discard(record_)
+                record_._values_to_write.records.discard(record_)
+
+    def _restore_deferred(self, groups):
+        """Keep the records of `groups` not written in ``'deferred'`` mode,
+        with their values (unless they have been updated since).
+        """
+        deferred = self._deferred
+        with deferred.lock:
+            # Records updated since are written after them
+            records = OrderedDict()
+            for _record, group, values in groups:
+                for record in group:
+                    for field, value in values.items():
+                        record._values_to_write[field].setdefault(record.id, value)
+                    records[record] = None
+            for record in deferred.records:
+                records.pop(record, None)
+                records[record] = None
+            deferred.records = records
+            if deferred.since is None:
+                deferred.since = time.time()
+
+    def _defer(self, record):
+        """Keep `record` updated in ``'deferred'`` mode, and write the
+        records kept if a threshold is reached (see :func:`commit`).
+        """
+        config = self._odoo.config
+        size, delay = config["commit_size"], config["commit_delay"]
+        deferred = self._deferred
+        with deferred.lock:
+            # Records are written in the order of their last change
+            deferred.records.pop(record, None)
+            deferred.records[record] = None
+            if deferred.since is None:
+                deferred.since = time.time()
+            flush = (size and len(deferred.records) >= size) or (
+                delay and time.time() - deferred.since >= delay
+            )
+            thread = not flush and delay and config["commit_thread"]
+            if thread and deferred.thread is None:
+                deferred.thread = threading.Thread(target=self._flush_later)
+                deferred.thread.daemon = True
+                deferred.thread.start()
+        _DEFERRED_ENVS.add(self)
+        # The change is kept even if a previous error is raised
+        self._raise_deferred_error()
+        if flush:
+            self._flush_deferred()
+
+    def _flush_deferred(self):
+        """Write the records updated in ``'deferred'`` mode."""
+        deferred = self._deferred
+        # Only one thread at a time writes the records, so that the
+        # interpreter does not exit while they are written by another one
+        with deferred.flush_lock:
+            with deferred.lock:
+                records, deferred.records = deferred.records, OrderedDict()
+                deferred.since = None
+            if records:
+                self._commit_records(records, restore=True)
+
+    def _flush_later(self):
+        """Write the records updated in ``'deferred'`` mode once the oldest
+        change is ``commit_delay`` seconds old (background thread).
+        """
+        deferred = self._deferred
+        while True:
+            with deferred.lock:
+                if deferred.since is None:
+                    deferred.thread = None
+                    return
+                delay = self._odoo.config["commit_delay"] or 0
+                wait = deferred.since + delay - time.time()
+            if wait > 0:
+                time.sleep(wait)
+                continue
+            try:
+                self._flush_deferred()
+            except Exception as exc:
+                # Raised in the thread updating or committing records
+                with deferred.lock:
+                    if deferred.error is None:
+                        deferred.error = exc
+
+    def _raise_deferred_error(self):
+        """Raise the error raised by the background thread writing the records
+        updated in ``'deferred'`` mode, if any.
+        """
+        deferred = self._deferred
+        with deferred.lock:
+            exc, deferred.error = deferred.error, None
+        if exc is not None:
+            raise exc
+
+    @property
+    def writes_avoided(self):
+        """Number of records committed without sending any request, as none
+        of their values changed (see :func:`commit`).
+
+        .. doctest::
+            :options: +SKIP
+
+            >>> user = odoo.env.user
+            >>> user.name = user.name
+            >>> odoo.env.writes_avoided
+            1
+        """
+        return self._stats["writes_avoided"]
 
     def invalidate(self):
-        """Invalidate the cache of records."""
+        """Invalidate the cache of records (and of the external IDs resolved)."""
+        with self._deferred.lock:
+            records = set(self.dirty) | set(self._deferred.records)
+            self._deferred.records = OrderedDict()
+            self._deferred.since = None
+        for record in records:
+            record._values_to_write.records.discard(record)
         self.dirty.clear()
+        self._xmlids.clear()
 
     @property
     def lang(self):
@@ -172,19 +461,76 @@ class Environment(object):
             >>> odoo.env.ref('base.lang_en')
             Recordset('res.lang', [1])
 
+        External IDs resolved are kept in cache by the environment
+        (until :func:`invalidate` is called), so that no request is sent to
+        resolve them again.
+
         :return: a :class:`odoorpc.models.Model` instance (recordset)
         :raise: :class:`odoorpc.error.RPCError`
         """
-        if v(self._odoo.version)[0] < 15:
-            model, id_ = self._odoo.execute(
-                "ir.model.data", "xmlid_to_res_model_res_id", xml_id, True
+        if xml_id not in self._xmlids:
+            module, name = xml_id.split(".", 1)
+            self._xmlids[xml_id] = tuple(
+                self._odoo.execute(
+                    "ir.model.data", "check_object_reference", module, name, True
+                )
             )
-        module, name = xml_id.split(".", 1)
-        model, id_ = self._odoo.execute(
-            "ir.model.data", "check_object_reference", module, name, True
-        )
+        model, id_ = self._xmlids[xml_id]
         return self[model].browse(id_)
 
+    def refs(self, xml_ids):
+        """Return the records corresponding to the given list of `xml_ids`
+        (in the same order), as :func:`ref` does.
+        External IDs which are not in cache are resolved by a single request,
+        and records are then browsed by model.
+
+        .. doctest::
+
+            >>> odoo.env.refs(['base.lang_en', 'base.main_company'])
+            [Recordset('res.lang', [1]), Recordset('res.company', [1])]
+
+        :return: a list of :class:`odoorpc.models.Model` instances (recordsets)
+        :raise: :class:`odoorpc.error.RPCError`
+        :raise: `ValueError` (external IDs not found)
+        """
+        names_by_module = {}
+        for xml_id in xml_ids:
+            if xml_id not in self._xmlids:
+                module, name = xml_id.split(".", 1)
+                names_by_module.setdefault(module, set()).add(name)
+        if names_by_module:
+            domain = ["|"] * (len(names_by_module) - 1)
+            for module, names in names_by_module.items():
+                domain.extend(
+                    ["&", ("module", "=", module), ("name", "in", sorted(names))]
+                )
+            data = self._odoo.execute(
+                "ir.model.data",
+                "search_read",
+                domain,
+                ["module", "name", "model", "res_id"],
+            )
+            for row in data:
+                xml_id = "{}.{}".format(row["module"], row["name"])
+                self._xmlids[xml_id] = (row["model"], row["res_id"])
+            missing = [xml_id for xml_id in xml_ids if xml_id not in self._xmlids]
+            if missing:
+                raise ValueError("External IDs not found: {}".format(missing))
+        # Browse the records of each model at once
+        ids_by_model = {}
+        for xml_id in xml_ids:
+            model, id_ = self._xmlids[xml_id]
+            ids_by_model.setdefault(model, []).append(id_)
+        records_by_model = dict(
+            (model, self[model].browse(ids)) for model, ids in ids_by_model.items()
+        )
+        result = []
+        for xml_id in xml_ids:
+            model, id_ = self._xmlids[xml_id]
+            records = records_by_model[model]
+            result.append(records._browse(self, id_, iterated=records))
+        return result
+
     @property
     def uid(self):
         """The user ID currently logged.
@@ -273,10 +619,15 @@ class Environment(object):
 
         :return: a :class:`odoorpc.models.Model` class
         """
-        if model not in self.registry:
-            # self.registry[model] = Model(self._odoo, self, model)
-            self.registry[model] = self._create_model_class(model)
-        return self.registry[model]
+        try:
+            return self.registry[model]
+        except KeyError:
+            pass
+        # Generate the class once, even if several threads need it
+        with self.registry.lock:
+            if model not in self.registry:
+                self.registry[model] = self._create_model_class(model)
+            return self.registry[model]
 
     def __call__(self, context=None):
         """Return an environment based on `self` with a different
@@ -286,6 +637,9 @@ class Environment(object):
         env = Environment(self._odoo, self._db, self._uid, context)
         env._dirty = self._dirty
         env._registry = self._registry
+        env._xmlids = self._xmlids
+        env._stats = self._stats
+        env._deferred = self._deferred
         return env
 
     def __contains__(self, model):
@@ -312,6 +666,7 @@ class Environment(object):
                 cls_name = cls_name.encode("utf-8")
         # Retrieve server fields info and generate corresponding local fields
         attrs = {
+            "__slots__": (),
             "_env": self,
             "_odoo": self._odoo,
             "_name": model,
@@ -324,3 +679,13 @@ class Environment(object):
                 attrs["_columns"][field_name] = Field
                 attrs[field_name] = Field
         return type(cls_name, (Model,), attrs)
+
+
+def _restore_env(odoo, context):
+    """Return an environment of `odoo` with `context` (used to unpickle
+    environments).
+    """
+    env = odoo.env
+    if env.context != context:
+        env = env(context=context)
+    return env
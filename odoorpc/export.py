@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# Copyright 2014 Sébastien Alix
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl)
+"""This module provides the :func:`export` function to export the records of
+a model in parallel, by running several processes.
+"""
+import json
+import multiprocessing
+import os
+import shutil
+
+
+def _get_partitions(ids, partitions):
+    """Split the sorted list of `ids` in `partitions` disjoint ranges
+    containing the same number of records, and return them as a list of
+    `(first_id, last_id)` tuples.
+    """
+    size, remainder = divmod(len(ids), partitions)
+    ranges = []
+    start = 0
+    for index in range(partitions):
+        end = start + size + (index < remainder)
+        if end > start:
+            ranges.append((ids[start], ids[end - 1]))
+        start = end
+    return ranges
+
+
+def _export_partition(task):
+    """Export the records of a range of IDs in a file (one JSON object per
+    line), from a worker process. The session is restored from the state of
+    the main one without any login request.
+    Return the number of records exported.
+    """
+    from odoorpc import ODOO
+
+    session, model, domain, fields, page_size, (first_id, last_id), path = task
+    odoo = ODOO(
+        session["host"],
+        protocol=session["protocol"],
+        port=session["port"],
+        timeout=session["timeout"],
+        version=session["version"],
+    )
+    odoo._restore_session(
+        session["db"],
+        session["login"],
+        session["password"],
+        session["uid"],
+        session["context"],
+    )
+    count = 0
+    with open(path, "w") as file_:
+        while True:
+            records = odoo.execute_kw(
+                model,
+                "search_read",
+                [domain + [("id", ">=", first_id), ("id", "<=", last_id)]],
+                {
+                    "fields": fields,
+                    "limit": page_size,
+                    "order": "id",
+                    "context": session["context"],
+                },
+            )
+            for data in records:
+                file_.write(json.dumps(data))
+                file_.write("\n")
+            count += len(records)
+            if len(records) < page_size:
+                break
+            first_id = records[-1]["id"] + 1
+    return count
+
+
+def export(
+    odoo,
+    model,
+    path,
+    domain=None,
+    fields=None,
+    processes=None,
+    partitions=None,
+    page_size=1000,
+    context=None,
+):
+    """Export the records of `model` matching `domain` in the file `path`,
+    one JSON object per line ordered by ID, and return the number of records
+    exported.
+
+    The IDs are split in `partitions` disjoint ranges (one per process by
+    default), each one exported by a worker process of a pool of `processes`
+    (the number of CPUs by default) in its own file, by pages of `page_size`
+    records. Files are then merged in the order of the ranges.
+    Decoding the data of large exports is CPU-bound, so splitting them in
+    several processes makes them scale with the number of cores.
+
+    Each worker opens its own connection to the server, and restores the
+    session of `odoo` without any login request:
+
+    .. doctest::
+        :options: +SKIP
+
+        >>> import odoorpc.export
+        >>> odoorpc.export.export(
+        ...     odoo, 'res.partner', 'partners.jsonl', fields=['name'])
+        42
+
+    *Python 2:*
+
+    :raise: :class:`odoorpc.error.RPCError`
+    :raise: :class:`odoorpc.error.InternalError` (if not logged)
+    :raise: `urllib2.URLError` (connection error)
+
+    *Python 3:*
+
+    :raise: :class:`odoorpc.error.RPCError`
+    :raise: :class:`odoorpc.error.InternalError` (if not logged)
+    :raise: `urllib.error.URLError` (connection error)
+    """
+    odoo._check_logged_user()
+    domain = domain or []
+    context = dict(odoo.env.context, **(context or {}))
+    processes = processes or multiprocessing.cpu_count()
+    ids = odoo.execute_kw(
+        model, "search", [domain], {"order": "id", "context": context}
+    )
+    session = {
+        "host": odoo.host,
+        "protocol": odoo.protocol,
+        "port": odoo.port,
+        "timeout": odoo.config["timeout"],
+        "version": odoo.version,
+        "db": odoo.env.db,
+        "login": odoo._login,
+        "password": odoo._password,
+        "uid": odoo.env.uid,
+        "context": context,
+    }
+    ranges = _get_partitions(ids, partitions or processes)
+    tasks = [
+        (session, model, domain, fields, page_size, range_, "%s.%s.part" % (path, i))
+        for i, range_ in enumerate(ranges)
+    ]
+    pool = multiprocessing.Pool(min(processes, len(tasks)) or 1)
+    try:
+        count = sum(pool.map(_export_partition, tasks))
+        with open(path, "wb") as output:
+            for task in tasks:
+                with open(task[-1], "rb") as part:
+                    shutil.copyfileobj(part, output)
+    finally:
+        pool.close()
+        pool.join()
+        for task in tasks:
+            if os.path.exists(task[-1]):
+                os.remove(task[-1])
+    return count
@@ -7,6 +7,7 @@ its related attribute.
 """
 import datetime
 import sys
+from collections import OrderedDict
 
 # from odoorpc import error
 from odoorpc.models import IncrementalRecords, Model
@@ -70,16 +71,26 @@ def odoo_tuple_in(iterable):
 
 
 def tuples2ids(tuples, ids):
-    """Update `ids` according to `tuples`, e.g. (3, 0, X), (4, 0, X)..."""
+    """Update `ids` according to `tuples`, e.g. (3, 0, X), (4, 0, X)...
+
+    >>> tuples2ids([(4, 3), (3, 1), (4, 2)], [1, 2])
+    [2, 3]
+    >>> tuples2ids([(6, 0, [4, 5]), (3, 4)], [1, 2])
+    [5]
+    """
+    # IDs kept in an ordered mapping, so that each command is applied in
+    # constant time
+    result = OrderedDict.fromkeys(ids)
     for value in tuples:
-        if value[0] == 6 and value[2]:
-            ids = value[2]
+        if value[0] == 6:
+            result = OrderedDict.fromkeys(value[2])
         elif value[0] == 5:
-            ids[:] = []
-        elif value[0] == 4 and value[1] and value[1] not in ids:
-            ids.append(value[1])
-        elif value[0] == 3 and value[1] and value[1] in ids:
-            ids.remove(value[1])
+            result.clear()
+        elif value[0] == 4 and value[1]:
+            result[value[1]] = None
+        elif value[0] == 3 and value[1]:
+            result.pop(value[1], None)
+    ids[:] = list(result)
     return ids
 
 
@@ -122,8 +133,13 @@ class BaseField(object):
         """Each time a record is modified, it is marked as dirty
         in the environment.
         """
+        instance._values_to_write.records.add(instance)
+        auto_commit = instance._odoo.config.get("auto_commit")
+        if auto_commit == "deferred":
+            instance.env._defer(instance)
+            return
         instance.env.dirty.add(instance)
-        if instance._odoo.config.get("auto_commit"):
+        if auto_commit:
             instance.env.commit()
 
     def __str__(self):
@@ -178,17 +194,36 @@ class BaseField(object):
         """Store the value in the record."""
         record._values[self.name][record.id] = value
 
+    def unchanged(self, record, value):
+        """Return `True` if `value` is the value of the field read from the
+        server for `record`, so that writing it would change nothing.
+        Values not read yet are never considered unchanged.
+        """
+        if record.id is None:
+            return False
+        loaded = record._values[self.name].get(record.id)
+        return loaded is not None and value == loaded
+
 
 class Binary(BaseField):
-    """Equivalent of the `fields.Binary` class."""
+    """Equivalent of the `fields.Binary` class.
+
+    The content is not fetched along with other fields when records are
+    browsed, but only when the field is accessed (for all the records of
+    the recordset iterated, if any).
+    """
 
     def __init__(self, name, data):
         super(Binary, self).__init__(name, data)
 
     def __get__(self, instance, owner):
-        value = instance._values[self.name][instance.id]
         if instance.id in instance._values_to_write[self.name]:
-            value = instance._values_to_write[self.name][instance.id]
+            return instance._values_to_write[self.name][instance.id]
+        value = instance._values[self.name].get(instance.id)
+        # None value => get the value on the fly
+        if value is None:
+            instance._fetch_binary(self, instance._prefetch_ids or instance._ids)
+            value = instance._values[self.name].get(instance.id)
         return value
 
     def __set__(self, instance, value):
@@ -461,6 +496,18 @@ class Many2many(BaseField):
         else:
             record._values[self.name][record.id] = tuples2ids(value, [])
 
+    def unchanged(self, record, value):
+        """Return `True` if the commands of `value` do not change the
+        records linked to `record`.
+        """
+        if record.id is None:
+            return False
+        loaded = record._values[self.name].get(record.id)
+        # Records to create/update/delete always imply a change
+        if loaded is None or any(command[0] in (0, 1, 2) for command in value):
+            return False
+        return set(tuples2ids(value, list(loaded))) == set(loaded)
+
 
 class Many2one(BaseField):
     """Represent the OpenObject 'fields.many2one'"""
@@ -595,6 +642,18 @@ class One2many(BaseField):
         else:
             record._values[self.name][record.id] = tuples2ids(value, [])
 
+    def unchanged(self, record, value):
+        """Return `True` if the commands of `value` do not change the
+        records linked to `record`.
+        """
+        if record.id is None:
+            return False
+        loaded = record._values[self.name].get(record.id)
+        # Records to create/update/delete always imply a change
+        if loaded is None or any(command[0] in (0, 1, 2) for command in value):
+            return False
+        return set(tuples2ids(value, list(loaded))) == set(loaded)
+
 
 class Reference(BaseField):
     """Represent the OpenObject 'fields.reference'."""
@@ -7,21 +7,54 @@ methods proposed by a data model.
 
 __all__ = ["Model"]
 
+import base64
+import io
+import json
+import os
+import shutil
 import sys
+import threading
+from collections import OrderedDict, namedtuple
 
 from odoorpc import error
+from odoorpc.tools import v
 
 # Python 2
 if sys.version_info[0] < 3:
+    from urllib import urlencode
+
+    import copy_reg as copyreg
+
     # noqa: F821
     NORMALIZED_TYPES = (int, long, str, unicode)  # noqa: F821
 # Python >= 3
 else:
+    import copyreg
+    from urllib.parse import urlencode
+
     NORMALIZED_TYPES = (int, str, bytes)
 
 
 FIELDS_RESERVED = ["id", "ids", "__odoo__", "__osv__", "__data__", "env"]
 
+# Maximum number of model classes attached to other environments
+# (see 'Model.with_env()') kept in cache for each model
+ENV_CLASSES_CACHE_SIZE = 32
+# Lock protecting these caches
+_ENV_CLASSES_LOCK = threading.Lock()
+
+
+def _reset_env_classes_lock():
+    """Replace the lock inherited from the parent process after a fork (it
+    could have been held by another thread).
+    """
+    global _ENV_CLASSES_LOCK
+    _ENV_CLASSES_LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_env_classes_lock)
+
 
 def _normalize_ids(ids):
     """Normalizes the ids argument for ``browse``."""
@@ -32,6 +65,34 @@ def _normalize_ids(ids):
     return list(ids)
 
 
+class FieldValues(dict):
+    """Mapping ``{field: {ID: value}}`` storing the values of a recordset.
+    The mapping of a field is only created once this field is used, so that
+    browsing a model with hundreds of fields does not allocate hundreds of
+    empty dictionaries.
+    """
+
+    __slots__ = ()
+
+    def __missing__(self, field):
+        values = self[field] = {}
+        return values
+
+
+class PendingValues(FieldValues):
+    """Mapping ``{field: {ID: value}}`` storing the values to write of a
+    recordset. It also keeps a reference to the records sharing these values
+    which have been updated, so that changes made through a record obtained
+    by iterating a recordset are not lost before being committed.
+    """
+
+    __slots__ = ("records",)
+
+    def __init__(self):
+        super(PendingValues, self).__init__()
+        self.records = set()
+
+
 class IncrementalRecords(object):
     """A helper class used internally by __iadd__ and __isub__ methods.
     Afterwards, field descriptors can adapt their behaviour when an instance of
@@ -72,7 +133,50 @@ class MetaModel(type):
 
 # An intermediate class used to associate the 'MetaModel' metaclass to the
 # 'Model' one with a Python 2 and Python 3 compatibility
-BaseModel = MetaModel("BaseModel", (), {})
+BaseModel = MetaModel("BaseModel", (), {"__slots__": ()})
+
+
+def _get_model(env, model):
+    """Return the class of `model` attached to `env` (used to unpickle
+    model classes).
+    """
+    return env[model].with_env(env)
+
+
+def _get_records(env, model, ids):
+    """Return the records of `model` attached to `env` (used to unpickle
+    records).
+    """
+    return _get_model(env, model).browse(ids)
+
+
+def _reduce_model_class(cls):
+    """Serialize model classes generated by environments as the environment
+    and the name of the model, other classes by reference.
+    """
+    if cls._env is None:
+        return cls.__name__
+    return _get_model, (cls._env, cls._name)
+
+
+# Classes are pickled by reference unless registered (Python 3 only)
+copyreg.pickle(MetaModel, _reduce_model_class)
+
+
+class _HybridMethod(object):
+    """Descriptor calling a class method when accessed from a model, and an
+    instance method when accessed from a recordset.
+    """
+
+    def __init__(self, cls_method, method):
+        self._cls_method = cls_method
+        self._method = method
+        self.__doc__ = cls_method.__func__.__doc__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self._cls_method.__get__(None, owner)
+        return self._method.__get__(instance, owner)
 
 
 class Model(BaseModel):
@@ -169,22 +273,28 @@ class Model(BaseModel):
     """
 
     __metaclass__ = MetaModel
+    __slots__ = (
+        "_env_local",
+        "_from_record",
+        "_ids",
+        "_prefetch_ids",
+        "_values",
+        "_values_to_write",
+        "__weakref__",
+    )
     _odoo = None
     _name = None
     _columns = {}  # {field: field object}
+    _origin_class = None  # Class generated by the environment
 
     def __init__(self):
         super(Model, self).__init__()
         self._env_local = None
         self._from_record = None
         self._ids = []
-        self._values = {}  # {field: {ID: value}}
-        self._values_to_write = {}  # {field: {ID: value}}
-        for field in self._columns:
-            self._values[field] = {}
-            self._values_to_write[field] = {}
-        self.with_context = self._with_context
-        self.with_env = self._with_env
+        self._prefetch_ids = None
+        self._values = FieldValues()  # {field: {ID: value}}
+        self._values_to_write = PendingValues()  # {field: {ID: value}}
 
     @property
     def env(self):
@@ -215,21 +325,23 @@ class Model(BaseModel):
 
         `iterated` can take the value of an iterated recordset, and no extra
         RPC queries are made to generate the resulting record (recordset and
-        its record share the same values).
+        its record share the same values). The values fetched on the fly
+        (binary fields) are then fetched for all the records of the iterated
+        recordset at once.
         """
-        records = cls()
+        records = cls.__new__(cls)
         records._env_local = env
         records._ids = _normalize_ids(ids)
+        records._prefetch_ids = None
         if iterated:
+            records._prefetch_ids = iterated._prefetch_ids or iterated._ids
+            records._from_record = None
             records._values = iterated._values
             records._values_to_write = iterated._values_to_write
         else:
             records._from_record = from_record
-            records._values = {}
-            records._values_to_write = {}
-            for field in cls._columns:
-                records._values[field] = {}
-                records._values_to_write[field] = {}
+            records._values = FieldValues()
+            records._values_to_write = PendingValues()
             records._init_values()
         return records
 
@@ -266,6 +378,115 @@ class Model(BaseModel):
         """
         return cls._browse(cls.env, ids)
 
+    @classmethod
+    def aggregate(
+        cls, domain=None, groupby=None, measures=None, orderby=None, limit=None
+    ):
+        """Aggregate on the server side the records matching `domain`, grouped
+        by the `groupby` fields (a date field can be suffixed by a granularity
+        like ``'date:month'``), computing the aggregate functions of the
+        `measures` dictionary (``{field: function}``).
+        The number of records of each group is always computed.
+
+        Groups are returned as named tuples, with one attribute per grouping
+        field (``:`` replaced by ``_``) and measure, plus `count`.
+        The values of `many2one` grouping fields are returned as
+        ``(id, name)`` tuples:
+
+        .. doctest::
+            :options: +SKIP
+
+            >>> Order = odoo.env['sale.order']
+            >>> Order.aggregate(
+            ...     [('state', '=', 'sale')], groupby=['partner_id'],
+            ...     measures={'amount_total': 'sum'})
+            [Group(partner_id=(10, 'Deco Addict'), amount_total=2947.5, count=3), ...]
+
+        .. note::
+            On `Odoo` < 12.0, the aggregate function defined on each measure
+            field is used whatever the function requested.
+
+        :return: a list of named tuples
+        :raise: :class:`odoorpc.error.RPCError`
+        """
+        domain = domain or []
+        groupby = groupby or []
+        measures = measures or {}
+        version = v(cls._odoo.version)[0]
+        # Keys of the values to read in each group, by attribute
+        keys = OrderedDict((group.replace(":", "_"), group) for group in groupby)
+        if version >= 19:
+            # 'read_group' is replaced by 'formatted_read_group'
+            aggregates = ["%s:%s" % item for item in measures.items()]
+            keys.update(zip(measures, aggregates))
+            method, args = "formatted_read_group", [domain]
+            kwargs = {
+                "groupby": groupby,
+                "aggregates": aggregates + ["__count"],
+                "order": orderby,
+                "limit": limit,
+            }
+        else:
+            if version >= 12:
+                fields = ["%s:%s" % item for item in measures.items()]
+            else:
+                fields = list(measures) + [group.split(":")[0] for group in groupby]
+            keys.update((field, field) for field in measures)
+            method, args = "read_group", [domain, fields, groupby]
+            # Expand all the groups at once
+            kwargs = {"lazy": False, "orderby": orderby, "limit": limit}
+        if cls._odoo.config["auto_context"]:
+            kwargs["context"] = cls.env.context
+        result = cls._odoo.execute_kw(cls._name, method, args, kwargs)
+        group_class = namedtuple("Group", list(keys) + ["count"], rename=True)
+        groups = []
+        for data in result:
+            values = [data.get(key) for key in keys.values()]
+            values = [tuple(val) if isinstance(val, list) else val for val in values]
+            # Number of records ('<groupby>_count' if groups have been expanded
+            # lazily by the server)
+            count = data.get("__count")
+            if count is None and groupby:
+                count = data.get("%s_count" % groupby[0].split(":")[0])
+            groups.append(group_class(*(values + [count])))
+        return groups
+
+    @classmethod
+    def stream_search_read(
+        cls, domain=None, fields=None, offset=0, limit=None, order=None
+    ):
+        """Return a generator of the data of the records matching `domain`
+        (dictionaries as returned by `search_read`), parsed one at a time
+        while the response is received.
+
+        Unlike `search_read`, the whole response is never loaded in memory,
+        and records can be processed before the end of the download:
+
+        .. doctest::
+            :options: +SKIP
+
+            >>> Partner = odoo.env['res.partner']
+            >>> for data in Partner.stream_search_read([], ['name']):
+            ...     print(data)
+            ...
+            {'id': 1, 'name': 'YourCompany'}
+            ...
+
+        The request is sent once the iteration starts. It is not sent again
+        if it fails (see the ``retry`` option of :attr:`odoorpc.ODOO.config`).
+
+        :return: a generator of dictionaries
+        :raise: :class:`odoorpc.error.RPCError`
+        """
+        kwargs = {"domain": domain or [], "fields": fields or [], "offset": offset}
+        if limit is not None:
+            kwargs["limit"] = limit
+        if order is not None:
+            kwargs["order"] = order
+        if cls._odoo.config["auto_context"]:
+            kwargs["context"] = cls.env.context
+        return cls._odoo._stream_kw(cls._name, "search_read", [], kwargs)
+
     @classmethod
     def with_context(cls, *args, **kwargs):
         """Return a model (or recordset) equivalent to the current model
@@ -315,20 +536,66 @@ class Model(BaseModel):
         context = dict(args[0] if args else self.env.context, **kwargs)
         return self.with_env(self.env(context=context))
 
+    with_context = _HybridMethod(with_context, _with_context)
+
     @classmethod
     def with_env(cls, env):
         """Return a model (or recordset) equivalent to the current model
         (or recordset) attached to `env`.
+
+        Models attached to environments sharing the same user and context
+        are cached, so that calling this method (or
+        :func:`with_context <odoorpc.models.Model.with_context>`) in a loop
+        does not generate a new class each time:
+
+        .. doctest::
+
+            >>> Product = odoo.env['product.product']
+            >>> Product.with_context(lang='fr_FR') is Product.with_context(lang='fr_FR')
+            True
         """
-        new_cls = type(cls.__name__, cls.__bases__, dict(cls.__dict__))
-        new_cls._env = env
-        return new_cls
+        origin = cls._origin_class or cls
+        if env is origin._env:
+            return origin
+        try:
+            key = (
+                id(env._odoo),
+                env.db,
+                env.uid,
+                json.dumps(env.context, sort_keys=True),
+            )
+        except (TypeError, ValueError):
+            key = None  # Context not serializable, the class is not cached
+        with _ENV_CLASSES_LOCK:
+            cache = origin.__dict__.get("_env_classes")
+            if cache is None:
+                cache = origin._env_classes = OrderedDict()
+            if key is not None and key in cache:
+                new_cls = cache.pop(key)
+                # The context of the environment may have been updated since
+                # then
+                if new_cls._env.context == env.context:
+                    cache[key] = new_cls
+                    return new_cls
+            # Fields descriptors are inherited from the original class
+            new_cls = type(
+                origin.__name__,
+                (origin,),
+                {"__slots__": (), "_env": env, "_origin_class": origin},
+            )
+            if key is not None:
+                cache[key] = new_cls
+                while len(cache) > ENV_CLASSES_CACHE_SIZE:
+                    cache.popitem(last=False)
+            return new_cls
 
     def _with_env(self, env):
         """As the `with_env` class method but for recordset."""
         res = self._browse(env, self._ids)
         return res
 
+    with_env = _HybridMethod(with_env, _with_env)
+
     def _init_values(self, context=None):
         """Retrieve field values from the server.
         May be used to restore the original values in the purpose to cancel
@@ -336,11 +603,12 @@ class Model(BaseModel):
         """
         if context is None:
             context = self.env.context
-        # Get basic fields (no relational ones)
+        # Get basic fields (no relational ones). Binary fields are excluded
+        # too, their content is fetched on the fly when accessed
         basic_fields = []
         for field_name in self._columns:
             field = self._columns[field_name]
-            if not getattr(field, "relation", False):
+            if not getattr(field, "relation", False) and field.type != "binary":
                 basic_fields.append(field_name)
         # Fetch values from the server
         if self.ids:
@@ -369,6 +637,327 @@ class Model(BaseModel):
             for field_name in self._columns:
                 self._values[field_name][None] = default_get.get(field_name, False)
 
+    def _check_binary_field(self, field):
+        """Raise a `ValueError` if `field` is not a binary field."""
+        if field not in self._columns or self._columns[field].type != "binary":
+            raise ValueError(
+                "'{}' is not a binary field of '{}'".format(field, self._name)
+            )
+
+    def open_binary(self, field):
+        """Return a file-like object to read the raw content of the binary
+        `field` of the current record. The content is streamed through the
+        ``/web/content`` HTTP route, without any base64 encoding, and is not
+        kept in the record:
+
+        .. doctest::
+            :options: +SKIP
+
+            >>> module = odoo.env.ref('base.module_base')
+            >>> icon = module.open_binary('icon_image')
+            >>> icon.read(8)
+            b'\\x89PNG\\r\\n\\x1a\\n'
+            >>> icon.close()
+
+        .. note::
+
+            The ``/web/content`` route requires a web session which is opened
+            transparently with the credentials of the user (API keys are not
+            accepted here). On `Odoo < 9.0` the content is read and decoded
+            through RPC instead.
+
+        *Python 2:*
+
+        :return: `urllib.addinfourl` (or `io.BytesIO` on `Odoo < 9.0`)
+        :raise: `ValueError` (not a binary field)
+        :raise: `urllib2.HTTPError` (no content, access denied...)
+        :raise: `urllib2.URLError` (connection error)
+
+        *Python 3:*
+
+        :return: `http.client.HTTPResponse` (or `io.BytesIO` on `Odoo < 9.0`)
+        :raise: `ValueError` (not a binary field)
+        :raise: `urllib.error.HTTPError` (no content, access denied...)
+        :raise: `urllib.error.URLError` (connection error)
+        """
+        self._check_binary_field(field)
+        if v(self._odoo.version)[0] < 9:
+            data = self.__class__.read(
+                [self.id], [field], context=self.env.context, load="_classic_write"
+            )
+            content = data[0][field] or ""
+            return io.BytesIO(base64.standard_b64decode(content.encode("ascii")))
+        self._odoo._check_web_session()
+        query = urlencode(
+            {"model": self._name, "id": self.id, "field": field, "download": "true"}
+        )
+        return self._odoo.http("web/content?%s" % query)
+
+    def read_binary(self, field):
+        """Return the raw content (`bytes`) of the binary `field` of the
+        current record. The base64 representation of the content is never
+        loaded, and the result is not cached in the record:
+
+        .. doctest::
+            :options: +SKIP
+
+            >>> module = odoo.env.ref('base.module_base')
+            >>> module.read_binary('icon_image')[:8]
+            b'\\x89PNG\\r\\n\\x1a\\n'
+
+        See :func:`open_binary <odoorpc.models.Model.open_binary>` for more
+        details.
+        """
+        response = self.open_binary(field)
+        try:
+            return response.read()
+        finally:
+            response.close()
+
+    def save_binary(self, field, path):
+        """Stream the raw content of the binary `field` of the current record
+        to the file located at `path`:
+
+        .. doctest::
+            :options: +SKIP
+
+            >>> module = odoo.env.ref('base.module_base')
+            >>> module.save_binary('icon_image', '/tmp/icon.png')
+
+        See :func:`open_binary <odoorpc.models.Model.open_binary>` for more
+        details.
+        """
+        response = self.open_binary(field)
+        try:
+            with open(path, "wb") as file_:
+                shutil.copyfileobj(response, file_)
+        finally:
+            response.close()
+
+    def _get_field(self, name):
+        """Return the field `name`, or raise a `ValueError`."""
+        if name not in self._columns:
+            raise ValueError("'{}' is not a field of '{}'".format(name, self._name))
+        return self._columns[name]
+
+    def _get_relational_ids(self, field):
+        """Return the IDs of the records related to each record through the
+        relational `field` (a dictionary ``{ID: [related IDs]}``), taking
+        into account the values not yet committed.
+        Values not fetched yet are read by one request for the whole recordset.
+        """
+        from odoorpc.fields import tuples2ids
+
+        name = field.name
+        values = self._values[name]
+        to_write = self._values_to_write[name]
+        missing = [
+            id_ for id_ in self._ids if values.get(id_) is None and id_ not in to_write
+        ]
+        if missing:
+            context = dict(self.env.context, **field.context)
+            rows = self.__class__.read(
+                missing, [name], context=context, load="_classic_write"
+            )
+            for row in rows:
+                values[row["id"]] = row[name]
+        result = {}
+        for id_ in self._ids:
+            if field.type == "many2one":
+                value = to_write[id_] if id_ in to_write else values.get(id_)
+                result[id_] = [value] if value else []
+            else:
+                ids = list(values.get(id_) or [])
+                if id_ in to_write:
+                    ids = tuples2ids(to_write[id_], ids)
+                result[id_] = ids
+        return result
+
+    def _get_values(self, field):
+        """Return the value of the non-relational `field` for each record
+        (a dictionary ``{ID: value}``), as returned by the field descriptor.
+        A single record sharing the values of the recordset is used to get
+        them, instead of one record per ID.
+        """
+        if field.type == "binary":
+            self._fetch_binary(field, self._ids)
+        cursor = self._browse(self.env, [], iterated=self)
+        result = {}
+        for id_ in self._ids:
+            cursor._ids = [id_]
+            result[id_] = field.__get__(cursor, self.__class__)
+        return result
+
+    def _fetch_binary(self, field, ids):
+        """Fetch at once the contents of the binary `field` not read yet
+        for the records identified by `ids`.
+        """
+        values = self._values[field.name]
+        missing = [id_ for id_ in ids if values.get(id_) is None]
+        if missing:
+            rows = self.__class__.read(
+                missing, [field.name], context=self.env.context, load="_classic_write"
+            )
+            for row in rows:
+                values[row["id"]] = row[field.name]
+
+    def _get_relation(self, field, ids):
+        """Return the recordset of `ids` related through the relational
+        `field`, with the context of the field.
+        """
+        env = self.env
+        if field.context:
+            context = env.context.copy()
+            context.update(field.context)
+            env = env(context=context)
+        return env[field.relation]._browse(env, ids)
+
+    def _resolve_path(self, path):
+        """Follow the dotted `path` of fields from the records.
+        Return the recordset of the last hop, a dictionary of the values of
+        the last field of the path for each record of this recordset (a list
+        of IDs for relational fields), the last field, and a dictionary
+        of the IDs of the recordset of the last hop related to each record.
+        Each hop reads the related records by one request.
+        """
+        names = path.split(".")
+        records = self
+        paths = dict((id_, [id_]) for id_ in self._ids)
+        for index, name in enumerate(names):
+            field = records._get_field(name)
+            last = index == len(names) - 1
+            if not getattr(field, "relation", False):
+                if not last:
+                    raise ValueError(
+                        "'{}' is not a relational field of '{}'".format(
+                            name, records._name
+                        )
+                    )
+                return records, records._get_values(field), field, paths
+            values = records._get_relational_ids(field)
+            if last:
+                return records, values, field, paths
+            # Related IDs of each record (without duplicates)
+            all_ids = OrderedDict()
+            for id_, ids in paths.items():
+                related_ids = OrderedDict()
+                for hop_id in ids:
+                    related_ids.update(dict.fromkeys(values[hop_id]))
+                paths[id_] = list(related_ids)
+                all_ids.update(related_ids)
+            records = records._get_relation(field, list(all_ids))
+
+    def mapped(self, func):
+        """Apply `func` on all records and return the result as a list, or
+        as a recordset if `func` returns recordsets. `func` can also be a
+        dotted path of field names:
+
+        .. doctest::
+            :options: +SKIP
+
+            >>> partners = odoo.env['res.partner'].browse([1, 3])
+            >>> partners.mapped('name')
+            ['YourCompany', 'Mitchell Admin']
+            >>> partners.mapped('country_id.code')
+            ['US']
+
+        Contrary to an iteration over the recordset, fields of a path are
+        read for all the records at once: no record is instanciated to get
+        the values of a field, and each relational field of the path
+        leads to a single request to read the related records.
+
+        :return: a list or a :class:`Model <odoorpc.models.Model>`
+            instance (recordset)
+        :raise: :class:`odoorpc.error.RPCError`
+        :raise: `ValueError` (unknown field)
+        """
+        if callable(func):
+            result = [func(record) for record in self]
+            if result and all(isinstance(value, Model) for value in result):
+                ids = OrderedDict()
+                for value in result:
+                    ids.update(dict.fromkeys(value.ids))
+                return result[0]._browse(result[0].env, list(ids))
+            return result
+        records, values, field, paths = self._resolve_path(func)
+        if getattr(field, "relation", False):
+            ids = OrderedDict()
+            for id_ in records._ids:
+                ids.update(dict.fromkeys(values[id_]))
+            return records._get_relation(field, list(ids))
+        return [values[id_] for id_ in records._ids]
+
+    def filtered(self, func):
+        """Return the records satisfying `func`, which can also be a dotted
+        path of field names (records are kept if one of the values found is
+        true):
+
+        .. doctest::
+            :options: +SKIP
+
+            >>> partners = odoo.env['res.partner'].browse([1, 3])
+            >>> partners.filtered('is_company')
+            Recordset('res.partner', [1])
+            >>> partners.filtered(lambda p: p.name.startswith('Mitchell'))
+            Recordset('res.partner', [3])
+
+        The resulting recordset shares the values of the current one.
+
+        :return: a :class:`Model <odoorpc.models.Model>` instance (recordset)
+        :raise: :class:`odoorpc.error.RPCError`
+        :raise: `ValueError` (unknown field)
+        """
+        if callable(func):
+            ids = [record.id for record in self if func(record)]
+        else:
+            records, values, field, paths = self._resolve_path(func)
+            ids = [
+                id_ for id_ in self._ids if any(values[hop_id] for hop_id in paths[id_])
+            ]
+        return self._browse(self.env, ids, iterated=self)
+
+    def sorted(self, key=None, reverse=False):
+        """Return the recordset ordered by `key`, a function or a dotted path
+        of field names. Records are ordered by the server according to the
+        default order of their model if no `key` is given:
+
+        .. doctest::
+            :options: +SKIP
+
+            >>> partners = odoo.env['res.partner'].browse([1, 3])
+            >>> partners.sorted('name', reverse=True)
+            Recordset('res.partner', [1, 3])
+
+        Empty values are placed at the end. The resulting recordset shares
+        the values of the current one.
+
+        :return: a :class:`Model <odoorpc.models.Model>` instance (recordset)
+        :raise: :class:`odoorpc.error.RPCError`
+        :raise: `ValueError` (unknown field)
+        """
+        if key is None:
+            ids = self.__class__.search(
+                [("id", "in", self._ids)],
+                context=dict(self.env.context, active_test=False),
+            )
+            if reverse:
+                ids.reverse()
+        elif callable(key):
+            records = sorted(self, key=key, reverse=reverse)
+            ids = [record.id for record in records]
+        else:
+            records, values, field, paths = self._resolve_path(key)
+            keys = {}
+            for id_ in self._ids:
+                hop_ids = paths[id_]
+                value = values[hop_ids[0]] if hop_ids else None
+                if getattr(field, "relation", False):
+                    value = value or None
+                empty = value is None or value is False
+                keys[id_] = (empty != reverse, None if empty else value)
+            ids = sorted(self._ids, key=keys.__getitem__, reverse=reverse)
+        return self._browse(self.env, ids, iterated=self)
+
     def __getattr__(self, method):
         """Provide a dynamic access to a RPC *instance* method (which applies
         on the current recordset).
@@ -421,10 +1010,16 @@ class Model(BaseModel):
     def __repr__(self):
         return "Recordset({!r}, {})".format(self._name, self.ids)
 
+    def __reduce__(self):
+        return _get_records, (self.env, self._name, self.ids)
+
     def __iter__(self):
-        """Return an iterator over `self`."""
+        """Return an iterator over `self`. Records share the values of the
+        recordset, so no data are copied.
+        """
+        env = self.env
         for id_ in self._ids:
-            yield self._browse(self.env, id_, iterated=self)
+            yield self._browse(env, id_, iterated=self)
 
     def __nonzero__(self):
         return bool(getattr(self, "_ids", True))
@@ -433,45 +1028,47 @@ class Model(BaseModel):
         return len(self.ids)
 
     def __iadd__(self, records):
-        if not self._from_record:
-            raise error.InternalError("No parent record to update")
-        try:
-            list(records)
-        except TypeError:
-            records = [records]
-        parent = self._from_record[0]
-        field = self._from_record[1]
-        updated_values = parent._values_to_write[field.name]
-        values = []
-        if updated_values.get(parent.id):
-            values = updated_values[parent.id][:]  # Copy
-        from odoorpc import fields
-
-        for id_ in fields.records2ids(records):
-            if (3, id_) in values:
-                values.remove((3, id_))
-            if (4, id_) not in values:
-                values.append((4, id_))
-        return IncrementalRecords(values)
+        return IncrementalRecords(self._get_x2many_commands(records, 4))
 
     def __isub__(self, records):
+        return self._get_x2many_commands(records, 3)
+
+    def _get_x2many_commands(self, records, command):
+        """Return the commands to write on the parent record of `self` to
+        link (`command` 4) or unlink (`command` 3) `records`, merged with the
+        commands not committed yet.
+
+        Link/unlink commands are kept by ID (the last one wins), and replaced
+        on a `many2many` field by a single ``(6, 0, IDS)`` command when it is
+        shorter (and no pending command creates, updates or deletes records).
+        """
         if not self._from_record:
             raise error.InternalError("No parent record to update")
         try:
             list(records)
         except TypeError:
             records = [records]
-        parent = self._from_record[0]
-        field = self._from_record[1]
-        updated_values = parent._values_to_write[field.name]
-        values = []
-        if updated_values.get(parent.id):
-            values = updated_values[parent.id][:]  # Copy
         from odoorpc import fields
 
+        parent = self._from_record[0]
+        field = self._from_record[1]
+        values = parent._values_to_write[field.name].get(parent.id) or []
+        # Only the trailing link/unlink commands are merged
+        index = len(values)
+        while index and values[index - 1][0] in (3, 4):
+            index -= 1
+        links = OrderedDict((value[1], value[0]) for value in values[index:])
         for id_ in fields.records2ids(records):
-            if (4, id_) in values:
-                values.remove((4, id_))
-            if (3, id_) not in values:
-                values.append((3, id_))
+            links[id_] = command
+        values = list(values[:index]) + [(cmd, id_) for id_, cmd in links.items()]
+        ids = parent._values[field.name].get(parent.id)
+        # Commands 0, 1 and 2 can not be expressed by a list of IDs
+        if (
+            field.type == "many2many"
+            and ids is not None
+            and all(value[0] in (3, 4, 5, 6) for value in values)
+        ):
+            ids = fields.tuples2ids(values, list(ids))
+            if len(ids) < len(values):
+                values = [(6, 0, ids)]
         return values
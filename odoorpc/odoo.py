@@ -4,11 +4,45 @@
 """This module contains the ``ODOO`` class which is the entry point to manage
 an `Odoo` server.
 """
+import json
+import os
+import threading
+import time
+import weakref
+
 from odoorpc import error, rpc, session, tools
 from odoorpc.db import DB
 from odoorpc.env import Environment
 from odoorpc.report import Report
 from odoorpc.rpc.jsonrpclib import Secret
+from odoorpc.rpc.retry import SAFE_METHODS
+
+# Read-only methods of models sent to the replicas (see the `replicas`
+# parameter of the ODOO class)
+REPLICA_METHODS = frozenset(
+    [
+        "fields_get",
+        "name_search",
+        "read",
+        "read_group",
+        "search",
+        "search_count",
+        "search_read",
+    ]
+)
+
+# Instances to reset in child processes after a fork
+_INSTANCES = weakref.WeakSet()
+
+
+def _reset_instances():
+    """Reset the instances inherited from the parent process after a fork."""
+    for odoo in list(_INSTANCES):
+        odoo._reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_instances)
 
 
 class ODOO(object):
@@ -22,8 +56,34 @@ class ODOO(object):
         >>> import odoorpc
         >>> odoo = odoorpc.ODOO('localhost', protocol='jsonrpc', port=8069)
 
+    With the ``jsonrpc+multi`` and ``jsonrpc+ssl+multi`` protocols, requests
+    are spread between several servers sharing the same database
+    (see :class:`odoorpc.rpc.ConnectorJSONRPCMulti`):
+
+    .. doctest::
+        :options: +SKIP
+
+        >>> odoo = odoorpc.ODOO('host1:8069,host2:8069', protocol='jsonrpc+multi')
+
+    Read-only methods of models (see ``odoorpc.odoo.REPLICA_METHODS``) can
+    be sent to read-only replicas of the server (using a replicated
+    database) with the `replicas` parameter, a list or a comma-separated
+    string of hosts (optionally followed by their port), while other
+    requests are sent to the main server:
+
+    .. doctest::
+        :options: +SKIP
+
+        >>> odoo = odoorpc.ODOO('primary', replicas='replica1,replica2:8070')
+
+    As replicas can lag behind the main server, the ``read_your_writes``
+    option (see :attr:`config`) sends read-only methods of a model to the
+    main server for a while after a change on this model.
+
     `OdooRPC` will try by default to detect the server version in order to
-    adapt its requests if necessary. However, it is possible to force the
+    adapt its requests if necessary (no request is sent at instanciation, the
+    version is detected once needed, and shared between instances connected
+    to the same server for a while). However, it is possible to force the
     version to use with the `version` parameter:
 
     .. doctest::
@@ -45,17 +105,35 @@ class ODOO(object):
         >>> opener = urllib.request.build_opener(auth_handler)
         >>> odoo = odoorpc.ODOO('example.net', port=80, opener=opener)
 
-    *Python 2:*
+    An instance can be shared by several threads (e.g. the workers of a
+    thread pool) once logged in: each request is sent through its own
+    `HTTP` connection, and records updated locally are committed by the
+    thread which updated them (see :class:`Environment
+    <odoorpc.env.Environment>`).
 
-    :raise: :class:`odoorpc.error.InternalError`
-    :raise: `ValueError` (wrong protocol, port value, timeout value)
-    :raise: `urllib2.URLError` (connection error)
+    Connections are reset in child processes after a fork (e.g. the workers
+    of a `multiprocessing` pool), while the session and the model classes
+    already generated are kept. An instance can also be pickled to be sent
+    to processes which are not forked (`spawn` start method): only the
+    connection parameters, the configuration options and the session are
+    serialized (but not the custom `opener`), and the session is restored
+    without any login request:
+
+    .. doctest::
+        :options: +SKIP
 
-    *Python 3:*
+        >>> import pickle
+        >>> odoo2 = pickle.loads(pickle.dumps(odoo))
+        >>> odoo2.env.user.name
+        'Administrator'
+
+    A connector built beforehand can be supplied with the `connector`
+    parameter instead of the `protocol` one, e.g. to record requests
+    and replay them later without any server (see
+    :class:`ConnectorCassette <odoorpc.rpc.cassette.ConnectorCassette>`).
 
     :raise: :class:`odoorpc.error.InternalError`
     :raise: `ValueError` (wrong protocol, port value, timeout value)
-    :raise: `urllib.error.URLError` (connection error)
     """
 
     def __init__(
@@ -66,13 +144,15 @@ class ODOO(object):
         timeout=120,
         version=None,
         opener=None,
+        replicas=None,
+        connector=None,
     ):
-        if protocol not in ["jsonrpc", "jsonrpc+ssl"]:
+        if protocol not in rpc.PROTOCOLS:
             txt = (
                 "The protocol '{0}' is not supported by the ODOO class. "
                 "Please choose a protocol among these ones: {1}"
             )
-            txt = txt.format(protocol, ["jsonrpc", "jsonrpc+ssl"])
+            txt = txt.format(protocol, sorted(rpc.PROTOCOLS))
             raise ValueError(txt)
         try:
             port = int(port)
@@ -86,24 +166,111 @@ class ODOO(object):
         self._host = host
         self._port = port
         self._protocol = protocol
+        self._replicas = replicas
+        self._pid = os.getpid()
         self._env = None
         self._login = None
         self._password = None
+        self._web_session = False
+        self._session_restored = False
         self._db = DB(self)
         self._report = Report(self)
         # Instanciate the server connector
-        try:
-            self._connector = rpc.PROTOCOLS[protocol](
-                self._host, self._port, timeout, version, opener=opener
-            )
-        except rpc.error.ConnectorError as exc:
-            raise error.InternalError(exc.message)
+        if connector is not None:
+            self._connector = connector
+            if version:
+                connector.version = version
+        else:
+            try:
+                self._connector = rpc.PROTOCOLS[protocol](
+                    self._host, self._port, timeout, version, opener=opener
+                )
+            except rpc.error.ConnectorError as exc:
+                raise error.InternalError(exc.message)
+        # Connector to the replicas, and last changes by model
+        self._replica_connector = None
+        self._writes = {}
+        # Read-only calls in progress (see `execute_kw`)
+        self._flights = tools.SingleFlight()
+        _INSTANCES.add(self)
+        if replicas:
+            replica_protocol = "ssl" in protocol and "jsonrpc+ssl+multi"
+            replica_protocol = replica_protocol or "jsonrpc+multi"
+            try:
+                self._replica_connector = rpc.PROTOCOLS[replica_protocol](
+                    replicas, self._port, timeout, version, opener=opener
+                )
+            except rpc.error.ConnectorError as exc:
+                raise error.InternalError(exc.message)
         # Dictionary of configuration options
         self._config = tools.Config(
             self,
-            {"auto_commit": True, "auto_context": True, "timeout": timeout},
+            {
+                "auto_commit": True,
+                "auto_context": True,
+                "timeout": timeout,
+                "retry": None,
+                "read_your_writes": 0,
+                "commit_size": 100,
+                "commit_delay": 1,
+                "commit_thread": False,
+            },
         )
 
+    def __getstate__(self):
+        """Return the connection parameters and the state of the session, to
+        pickle the instance.
+        """
+        session = None
+        if self._env:
+            session = {
+                "db": self._env.db,
+                "login": self._login,
+                "password": str(self._password),
+                "uid": self._env.uid,
+                "context": self._env.context,
+            }
+        return {
+            "host": self._host,
+            "protocol": self._protocol,
+            "port": self._port,
+            "version": self._connector._version,
+            "replicas": self._replicas,
+            "config": dict(self.config),
+            "session": session,
+        }
+
+    def __setstate__(self, state):
+        """Restore a pickled instance, without sending any request (the
+        session is restored, see :func:`_restore_session`).
+        """
+        self.__init__(
+            state["host"],
+            state["protocol"],
+            state["port"],
+            state["config"]["timeout"],
+            state["version"],
+            replicas=state["replicas"],
+        )
+        for key, value in state["config"].items():
+            self.config[key] = value
+        if state["session"]:
+            self._restore_session(**state["session"])
+
+    def _reset(self):
+        """Reset the connections and locks inherited from the parent process
+        after a fork. The session, model classes and records are kept.
+        """
+        self._pid = os.getpid()
+        for connector in (self._connector, self._replica_connector):
+            if connector is not None:
+                connector.reset()
+        self._flights = tools.SingleFlight()
+        self._report._lock = threading.Lock()
+        if self._env:
+            self._env.registry.lock = threading.RLock()
+            self._env._deferred.reset()
+
     @property
     def config(self):
         """Dictionary of available configuration options.
@@ -112,7 +279,7 @@ class ODOO(object):
             :options: +SKIP
 
             >>> odoo.config
-            {'auto_commit': True, 'auto_context': True, 'timeout': 120}
+            {'auto_commit': True, 'auto_context': True, 'timeout': 120, 'retry': None, 'read_your_writes': 0, 'commit_size': 100, 'commit_delay': 1, 'commit_thread': False}
 
         .. doctest::
             :hide:
@@ -123,10 +290,13 @@ class ODOO(object):
             True
             >>> 'timeout' in odoo.config
             True
+            >>> 'retry' in odoo.config
+            True
 
         - ``auto_commit``: if set to `True` (default), each time a value is set
           on a record field a RPC request is sent to the server to update the
-          record (see :func:`odoorpc.env.Environment.commit`).
+          record. If set to ``'deferred'``, updated records are written by
+          batches (see :func:`odoorpc.env.Environment.commit`).
 
         - ``auto_context``: if set to `True` (default), the user context will
           be sent automatically to every call of a
@@ -148,6 +318,31 @@ class ODOO(object):
 
             >>> odoo.config['timeout'] = 300
 
+        - ``retry``: a :class:`RetryPolicy <odoorpc.rpc.retry.RetryPolicy>`
+          defining which failed requests are sent again, and when
+          (default: `None`, no request is sent again):
+
+            >>> from odoorpc.rpc.retry import RetryPolicy
+            >>> odoo.config['retry'] = RetryPolicy(max_retries=5, backoff=1)
+
+        - ``read_your_writes``: if replicas are used, number of seconds during
+          which read-only methods of a model are sent to the main server after
+          a change on this model, so that the change can be read (default:
+          `0`, disabled):
+
+            >>> odoo.config['read_your_writes'] = 10
+
+        - ``commit_size``, ``commit_delay``: with ``auto_commit`` set to
+          ``'deferred'``, number of updated records (default: `100`) and age
+          in seconds of the oldest change (default: `1`) from which updated
+          records are written (`0` to disable a threshold):
+
+            >>> odoo.config['commit_size'] = 1000
+
+        - ``commit_thread``: with ``auto_commit`` set to ``'deferred'``, write
+          the changes older than ``commit_delay`` seconds from a background
+          thread (default: `False`, they are written by the next change).
+
         """
         return self._config
 
@@ -160,6 +355,16 @@ class ODOO(object):
 
             >>> odoo.version
             '12.0'
+
+        *Python 2:*
+
+        :raise: `urllib2.URLError` (connection error, if the version has to
+            be detected)
+
+        *Python 3:*
+
+        :raise: `urllib.error.URLError` (connection error, if the version has
+            to be detected)
         """
         return self._connector.version
 
@@ -269,11 +474,37 @@ class ODOO(object):
         :raise: `urllib.error.HTTPError` (if `params` is not a dictionary)
         :raise: `urllib.error.URLError` (connection error)
         """
-        data = self._connector.proxy_json(url, params)
+        return self._json(url, params, self._connector)
+
+    def _json(self, url, params, connector):
+        """Execute a JSON query with `connector`
+        (see :func:`json <odoorpc.ODOO.json>`).
+        """
+        if self._pid != os.getpid():
+            # Forked without `os.register_at_fork` (Python < 3.7)
+            self._reset()
+        data = connector.proxy_json(url, params)
         if data.get("error"):
             raise error.RPCError(data["error"]["data"]["message"], data["error"])
         return data
 
+    def _get_connector(self, model, method):
+        """Return the connector to use to execute the `method` of `model`:
+        the connector to the replicas for read-only methods, except if
+        `model` has been changed recently (``read_your_writes`` option).
+        """
+        if self._replica_connector is None:
+            return self._connector
+        now = time.time()
+        if method not in REPLICA_METHODS:
+            if method not in SAFE_METHODS:
+                self._writes[model] = now
+            return self._connector
+        delay = self.config["read_your_writes"]
+        if delay and now - self._writes.get(model, 0) < delay:
+            return self._connector
+        return self._replica_connector
+
     def http(self, url, data=None, headers=None):
         """Low level method to execute raw HTTP queries.
 
@@ -317,6 +548,23 @@ class ODOO(object):
         if not self._env or not self._password or not self._login:
             raise error.InternalError("Login required")
 
+    def _check_web_session(self):
+        """Open a web session (based on a cookie) for the logged user if
+        not done yet. Such session is required by some HTTP routes (to
+        download binary contents, reports...).
+        """
+        self._check_logged_user()
+        if not self._web_session:
+            self.json(
+                "/web/session/authenticate",
+                {
+                    "db": self.env.db,
+                    "login": self._login,
+                    "password": self._password,
+                },
+            )
+            self._web_session = True
+
     def login(self, db, login="admin", password="admin"):
         """Log in as the given `user` with the password `passwd` on the
         database `db`.
@@ -339,6 +587,20 @@ class ODOO(object):
         :raise: `urllib.error.URLError` (connection error)
         """
         password = Secret(password)
+        uid, context = self._authenticate(db, login, password)
+        self._env = Environment(self, db, uid, context=context)
+        self._login = login
+        self._password = password
+        # The web session is already opened on Odoo < 10.0
+        self._web_session = tools.v(self.version)[0] < 10
+        self._session_restored = False
+        self._report.invalidate()
+
+    def _authenticate(self, db, login, password):
+        """Authenticate the user on the server, and return its ID and context.
+
+        :raise: :class:`odoorpc.error.RPCError` (wrong login ID or password)
+        """
         # Get the user's ID and generate the corresponding user record
         if tools.v(self.version)[0] >= 10:
             data = self.json(
@@ -357,25 +619,55 @@ class ODOO(object):
                 {"db": db, "login": login, "password": password},
             )
             uid = data["result"]["uid"]
-        if uid:
-            if tools.v(self.version)[0] >= 10:
-                args_to_send = [db, uid, password, "res.users", "context_get"]
-                context = self.json(
-                    "/jsonrpc",
-                    {
-                        "service": "object",
-                        "method": "execute",
-                        "args": args_to_send,
-                    },
-                )["result"]
-                context["uid"] = uid
-            else:
-                context = data["result"]["user_context"]
-            self._env = Environment(self, db, uid, context=context)
-            self._login = login
-            self._password = password
-        else:
+        if not uid:
             raise error.RPCError("Wrong login ID or password")
+        if tools.v(self.version)[0] >= 10:
+            args_to_send = [db, uid, password, "res.users", "context_get"]
+            context = self.json(
+                "/jsonrpc",
+                {
+                    "service": "object",
+                    "method": "execute",
+                    "args": args_to_send,
+                },
+            )["result"]
+            context["uid"] = uid
+        else:
+            context = data["result"]["user_context"]
+        return uid, context
+
+    def _restore_session(self, db, login, password, uid, context):
+        """Restore the session of a user from its state (user ID and context)
+        without sending any request to the server.
+
+        The session is validated by the first RPC query: if the server denies
+        the access (user ID changed, etc), the user is authenticated again and
+        the query is sent once more.
+        """
+        self._env = Environment(self, db, uid, context=context)
+        self._login = login
+        self._password = Secret(password)
+        self._web_session = False
+        self._session_restored = True
+
+    def _renew_restored_session(self, exc):
+        """Authenticate again the user of a restored session if `exc` (an
+        :class:`odoorpc.error.RPCError` raised by the first RPC query sent
+        with this session) is an access error.
+        Return `True` if the session has been renewed (the query can be sent
+        again), `False` otherwise.
+        """
+        if not self._session_restored:
+            return False
+        self._session_restored = False
+        data = exc.info and exc.info.get("data") or {}
+        if "AccessDenied" not in (data.get("name") or ""):
+            return False
+        uid, context = self._authenticate(self.env.db, self._login, self._password)
+        self._env._uid = uid
+        self._env._context.clear()
+        self._env._context.update(context)
+        return True
 
     def logout(self):
         """Log out the user.
@@ -402,6 +694,9 @@ class ODOO(object):
         self._env = None
         self._login = None
         self._password = None
+        self._web_session = False
+        self._session_restored = False
+        self._report.invalidate()
         return True
 
     def close(self):
@@ -468,10 +763,17 @@ class ODOO(object):
             method,
         ]
         args_to_send.extend(args)
-        data = self.json(
-            "/jsonrpc",
-            {"service": "object", "method": "execute", "args": args_to_send},
-        )
+        try:
+            data = self._json(
+                "/jsonrpc",
+                {"service": "object", "method": "execute", "args": args_to_send},
+                self._get_connector(model, method),
+            )
+        except error.RPCError as exc:
+            if self._renew_restored_session(exc):
+                return self.execute(model, method, *args)
+            raise
+        self._session_restored = False
         return data.get("result")
 
     def execute_kw(self, model, method, args=None, kwargs=None):
@@ -495,6 +797,11 @@ class ODOO(object):
             >>> data[0]['name'] == 'YourCompany'
             True
 
+        When several threads share the same instance, identical calls to a
+        read-only method (same model, method, arguments and context) made
+        while one of them is in progress share its request, and each one
+        gets a copy of its result.
+
         *Python 2:*
 
         :return: the result returned by the `method` called
@@ -510,9 +817,25 @@ class ODOO(object):
         :raise: `urllib.error.URLError` (connection error)
         """
         self._check_logged_user()
-        # Execute the query
         args = args or []
         kwargs = kwargs or {}
+        if method not in SAFE_METHODS:
+            return self._execute_kw(model, method, args, kwargs)
+        # Identical read-only calls in progress in other threads share the
+        # same request
+        key = (
+            self.env.db,
+            self.env.uid,
+            model,
+            method,
+            json.dumps([args, kwargs], sort_keys=True, default=repr),
+        )
+        return self._flights.call(key, self._execute_kw, model, method, args, kwargs)
+
+    def _execute_kw(self, model, method, args, kwargs):
+        """Send the request executing the `method` of `model`
+        (see :func:`execute_kw <odoorpc.ODOO.execute_kw>`).
+        """
         args_to_send = [
             self.env.db,
             self.env.uid,
@@ -521,15 +844,55 @@ class ODOO(object):
             method,
         ]
         args_to_send.extend([args, kwargs])
-        data = self.json(
+        try:
+            data = self._json(
+                "/jsonrpc",
+                {
+                    "service": "object",
+                    "method": "execute_kw",
+                    "args": args_to_send,
+                },
+                self._get_connector(model, method),
+            )
+        except error.RPCError as exc:
+            if self._renew_restored_session(exc):
+                return self._execute_kw(model, method, args, kwargs)
+            raise
+        self._session_restored = False
+        return data.get("result")
+
+    def _stream_kw(self, model, method, args=None, kwargs=None):
+        """Execute the `method` of `model` returning a list, and return a
+        generator of its elements parsed while the response is received
+        (see :func:`execute_kw <odoorpc.ODOO.execute_kw>`), so that the whole
+        response is never loaded in memory.
+        The request is sent once the iteration starts.
+        """
+        self._check_logged_user()
+        return self._stream(model, method, args or [], kwargs or {})
+
+    def _stream(self, model, method, args, kwargs):
+        if self._pid != os.getpid():
+            self._reset()
+        args_to_send = [self.env.db, self.env.uid, self._password, model, method]
+        args_to_send.extend([args, kwargs])
+        connector = self._get_connector(model, method)
+        elements = connector.proxy_json.stream(
             "/jsonrpc",
-            {
-                "service": "object",
-                "method": "execute_kw",
-                "args": args_to_send,
-            },
+            {"service": "object", "method": "execute_kw", "args": args_to_send},
         )
-        return data.get("result")
+        try:
+            for element in elements:
+                yield element
+        except rpc.error.ConnectorError as exc:
+            exc = error.RPCError(exc.message, exc.odoo_traceback)
+            if not self._renew_restored_session(exc):
+                raise exc
+            # Errors are returned without any element
+            for element in self._stream(model, method, args, kwargs):
+                yield element
+            return
+        self._session_restored = False
 
     def exec_workflow(self, model, record_id, signal):
         """Execute the workflow `signal` on
@@ -559,21 +922,27 @@ class ODOO(object):
             signal,
             record_id,
         ]
-        data = self.json(
-            "/jsonrpc",
-            {
-                "service": "object",
-                "method": "exec_workflow",
-                "args": args_to_send,
-            },
-        )
+        try:
+            data = self.json(
+                "/jsonrpc",
+                {
+                    "service": "object",
+                    "method": "exec_workflow",
+                    "args": args_to_send,
+                },
+            )
+        except error.RPCError as exc:
+            if self._renew_restored_session(exc):
+                return self.exec_workflow(model, record_id, signal)
+            raise
+        self._session_restored = False
         return data.get("result")
 
     # ---------------------- #
     # -- Session methods  -- #
     # ---------------------- #
 
-    def save(self, name, rc_file="~/.odoorpcrc"):
+    def save(self, name, rc_file="~/.odoorpcrc", warm_start=False):
         """Save the current :class:`ODOO <odoorpc.ODOO>` instance (a `session`)
         inside `rc_file` (``~/.odoorpcrc`` by default). This session will be
         identified by `name`::
@@ -587,6 +956,14 @@ class ODOO(object):
         stored sessions, and the :func:`load <odoorpc.ODOO.load>` class method
         to retrieve an already-connected :class:`ODOO <odoorpc.ODOO>` instance.
 
+        If `warm_start` is set to `True`, the state of the session (user ID,
+        user context and server version) is saved too. Loading such session
+        does not send any request to the server, the session being validated
+        by the first RPC query (the user is logged in again if the server
+        denies the access)::
+
+            >>> odoo.save('foo', warm_start=True)
+
         *Python 2:*
 
         :raise: :class:`odoorpc.error.InternalError` (if not logged)
@@ -609,6 +986,14 @@ class ODOO(object):
             "passwd": self._password,
             "database": self.env.db,
         }
+        if warm_start:
+            data.update(
+                {
+                    "uid": self.env.uid,
+                    "context": self.env.context,
+                    "version": self.version,
+                }
+            )
         session.save(name, data, rc_file)
 
     @classmethod
@@ -622,7 +1007,8 @@ class ODOO(object):
             >>> odoo = odoorpc.ODOO.load('foo')
 
         Such sessions are stored with the
-        :func:`save <odoorpc.ODOO.save>` method.
+        :func:`save <odoorpc.ODOO.save>` method. Sessions saved with their
+        state (`warm_start` option) are restored without any request.
 
         *Python 2:*
 
@@ -644,8 +1030,20 @@ class ODOO(object):
             protocol=data["protocol"],
             port=data["port"],
             timeout=data["timeout"],
+            version=data.get("version"),
         )
-        odoo.login(db=data["database"], login=data["user"], password=data["passwd"])
+        if "uid" in data:
+            odoo._restore_session(
+                data["database"],
+                data["user"],
+                data["passwd"],
+                data["uid"],
+                data["context"],
+            )
+        else:
+            odoo.login(
+                db=data["database"], login=data["user"], password=data["passwd"]
+            )
         return odoo
 
     @classmethod
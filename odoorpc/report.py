@@ -6,9 +6,31 @@ to generate/download them.
 """
 import base64
 import io
+import json
+import shutil
+import sys
+import threading
+from multiprocessing.pool import ThreadPool
 
 from odoorpc.tools import get_encodings, v
 
+# Python 2
+if sys.version_info[0] < 3:
+    from urllib import quote, urlencode
+
+    from urlparse import urlparse
+# Python >= 3
+else:
+    from urllib.parse import quote, urlencode, urlparse
+
+# HTTP routes converting reports by type (Odoo >= 14), and the content type
+# of their response
+REPORT_ROUTES = {
+    "qweb-pdf": ("pdf", "application/pdf"),
+    "qweb-html": ("html", "text/html"),
+    "qweb-text": ("text", "text/plain"),
+}
+
 
 def encode2bytes(data):
     for encoding in get_encodings():
@@ -45,16 +67,21 @@ class Report(object):
         >>> odoo.login(DB, USER, PWD)
         >>> odoo.report
         <odoorpc.report.Report object at ...>
+
+    The metadata of reports (ID, data model and type) is loaded once with a
+    single request, and kept until the user logs in or out. Call
+    :func:`invalidate` to load it again after installing or updating
+    reports on the server.
     """
 
     def __init__(self, odoo):
         self._odoo = odoo
+        self._lock = threading.Lock()
+        self._reports = None
 
     def download(self, name, ids, datas=None, context=None):
         """Download a report from the server and return it as a remote file.
 
-        Warning: this feature is not supported for Odoo >= 14 (CSRF token required).
-
         For instance, to download the "Quotation / Order" report of sale orders
         identified by the IDs ``[2, 3]``:
 
@@ -66,9 +93,7 @@ class Report(object):
         .. doctest::
             :hide:
 
-            >>> from odoorpc.tools import v
-            >>> if v(VERSION) < v('14.0'):
-            ...     report = odoo.report.download('sale.report_saleorder', [2])
+            >>> report = odoo.report.download('sale.report_saleorder', [2])
 
         Write it on the file system:
 
@@ -82,54 +107,47 @@ class Report(object):
         .. doctest::
             :hide:
 
-            >>> from odoorpc.tools import v
-            >>> if v(VERSION) < v('14.0'):
-            ...     with open('sale_orders.pdf', 'wb') as report_file:
-            ...         fileno = report_file.write(report.read())   # Python 3
+            >>> with open('sale_orders.pdf', 'wb') as report_file:
+            ...     fileno = report_file.write(report.read())   # Python 3
             ...
 
+        On `Odoo >= 14.0`, the report is downloaded through the HTTP route
+        of its type (``/report/pdf/<name>/<ids>`` for PDF reports) with the
+        web session of the user, and the response is returned as is so that
+        it can be read by chunks (see :func:`save`). Such `GET` requests
+        do not require any CSRF token.
+
         *Python 2:*
 
-        :return: `io.BytesIO`
+        :return: `io.BytesIO` (`urllib.addinfourl` on `Odoo >= 14.0`)
         :raise: :class:`odoorpc.error.RPCError` (wrong parameters)
         :raise: `ValueError`  (received invalid data)
+        :raise: `urllib2.HTTPError`  (report error on `Odoo >= 14.0`)
         :raise: `urllib2.URLError`  (connection error)
 
         *Python 3:*
 
-        :return: `io.BytesIO`
+        :return: `io.BytesIO` (`http.client.HTTPResponse` on
+            `Odoo >= 14.0`)
         :raise: :class:`odoorpc.error.RPCError` (wrong parameters)
         :raise: `ValueError`  (received invalid data)
+        :raise: `urllib.error.HTTPError` (report error on `Odoo >= 14.0`)
         :raise: `urllib.error.URLError` (connection error)
         """
         if context is None:
             context = self._odoo.env.context
+        if not isinstance(ids, (list, tuple)):
+            ids = [ids]
+        report = self._check_report(name)
 
-        def check_report(name):
-            report_model = "ir.actions.report"
-            if v(self._odoo.version)[0] < 11:
-                report_model = "ir.actions.report.xml"
-            IrReport = self._odoo.env[report_model]
-            report_ids = IrReport.search([("report_name", "=", name)])
-            report_id = report_ids and report_ids[0] or False
-            if not report_id:
-                raise ValueError("The report '%s' does not exist." % name)
-            return report_id
-
-        report_id = check_report(name)
-
+        # Odoo >= 14.0
+        if v(self._odoo.version)[0] >= 14:
+            return self._open(name, ids, report["report_type"], datas, context)
         # Odoo >= 11.0
-        if v(self._odoo.version)[0] >= 11:
+        elif v(self._odoo.version)[0] >= 11:
             IrReport = self._odoo.env["ir.actions.report"]
-            report = IrReport.browse(report_id)
-            if v(self._odoo.version)[0] >= 14:
-                # Need a CSRF token to print reports on Odoo >= 14
-                raise NotImplementedError
-                # response = report.with_context(context)._render(
-                #     ids, data=datas
-                # )
-            else:
-                response = report.with_context(context).render(ids, data=datas)
+            report = IrReport.browse(report["id"])
+            response = report.with_context(context).render(ids, data=datas)
             content = response[0]
             # On the server the result is a bytes string,
             # but the RPC layer of Odoo returns it as a unicode string,
@@ -138,6 +156,10 @@ class Report(object):
             return io.BytesIO(result)
         # Odoo < 11.0
         else:
+            # The 'report' service of Odoo < 10.0 requires a web session,
+            # not opened yet if the session has been restored (warm start)
+            if v(self._odoo.version)[0] < 10:
+                self._odoo._check_web_session()
             args_to_send = [
                 self._odoo.env.db,
                 self._odoo.env.uid,
@@ -163,6 +185,135 @@ class Report(object):
             content = base64.standard_b64decode(result)
             return io.BytesIO(content)
 
+    def save(self, name, ids, path, datas=None, context=None):
+        """Download a report (see :func:`download`) and write it in the file
+        located at `path`. On `Odoo >= 14.0`, the content is streamed to the
+        file, and never entirely loaded in memory:
+
+        .. doctest::
+            :options: +SKIP
+
+            >>> odoo.report.save('sale.report_saleorder', [2, 3], 'orders.pdf')
+        """
+        report = self.download(name, ids, datas, context)
+        try:
+            with open(path, "wb") as file_:
+                shutil.copyfileobj(report, file_)
+        finally:
+            report.close()
+
+    def download_many(self, name, ids, path, workers=4, datas=None, context=None):
+        """Download the report of each record identified by `ids` in its own
+        file, located at `path` formatted with the ID of the record
+        (e.g. ``'invoice_{id}.pdf'``), and return the list of paths.
+        Reports are rendered concurrently by the server, at most `workers`
+        at a time:
+
+        .. doctest::
+            :options: +SKIP
+
+            >>> odoo.report.download_many(
+            ...     'account.report_invoice', [1, 2, 3], '/tmp/invoice_{id}.pdf')
+            ['/tmp/invoice_1.pdf', '/tmp/invoice_2.pdf', '/tmp/invoice_3.pdf']
+
+        The first error encountered is raised once all the downloads are
+        done (see :func:`download`).
+        """
+        if context is None:
+            context = self._odoo.env.context
+        self._check_report(name)
+        if v(self._odoo.version)[0] >= 14:
+            # Open the web session before sending concurrent requests
+            self._odoo._check_web_session()
+        paths = [path.format(id=id_) for id_ in ids]
+
+        def save(args):
+            self.save(name, [args[0]], args[1], datas, context)
+            return args[1]
+
+        pool = ThreadPool(max(1, min(workers, len(paths))))
+        try:
+            return pool.map(save, list(zip(ids, paths)))
+        finally:
+            pool.close()
+            pool.join()
+
+    def invalidate(self):
+        """Clear the metadata of reports, loaded again by the next call to
+        :func:`download` or :func:`list`.
+
+        .. doctest::
+            :options: +SKIP
+
+            >>> odoo.report.invalidate()
+        """
+        with self._lock:
+            self._reports = None
+
+    def _get_reports(self):
+        """Return the metadata of all reports (a list of dictionaries) and a
+        dictionary ``{report_name: data}`` to look them up, read from the
+        server with a single request the first time.
+        """
+        with self._lock:
+            if self._reports is None:
+                report_model = "ir.actions.report"
+                if v(self._odoo.version)[0] < 11:
+                    report_model = "ir.actions.report.xml"
+                IrReport = self._odoo.env[report_model]
+                reports = IrReport.search_read(
+                    [], ["name", "model", "report_name", "report_type"]
+                )
+                # Several actions can share the same name, the first one is
+                # used to download the report
+                names = {}
+                for report in reports:
+                    names.setdefault(report["report_name"], report)
+                self._reports = (reports, names)
+            return self._reports
+
+    def _check_report(self, name):
+        """Return the metadata (ID, data model and type) of the report `name`.
+
+        :raise: `ValueError` (the report does not exist)
+        """
+        report = self._get_reports()[1].get(name)
+        if not report:
+            raise ValueError("The report '%s' does not exist." % name)
+        return report
+
+    def _open(self, name, ids, report_type, datas, context, retry=True):
+        """Send the request downloading the report through its HTTP route
+        (`Odoo >= 14.0`), and return the response.
+        """
+        converter, content_type = REPORT_ROUTES.get(
+            report_type, REPORT_ROUTES["qweb-pdf"]
+        )
+        self._odoo._check_web_session()
+        query = {"context": json.dumps(context)}
+        if datas:
+            query["options"] = json.dumps(datas)
+        url = "report/%s/%s/%s?%s" % (
+            converter,
+            quote(name),
+            ",".join(str(id_) for id_ in ids),
+            urlencode(query),
+        )
+        response = self._odoo.http(url)
+        received = response.info().get("Content-Type") or ""
+        # The web session has expired, the request has been redirected to
+        # the login page (also an HTML page, like `qweb-html` reports)
+        expired = urlparse(response.geturl()).path.endswith("/web/login")
+        if not expired and received.startswith(content_type):
+            return response
+        response.close()
+        if retry and expired:
+            self._odoo._web_session = False
+            return self._open(name, ids, report_type, datas, context, retry=False)
+        raise ValueError(
+            "Received invalid data ('%s' instead of '%s')." % (received, content_type)
+        )
+
     def list(self):
         """List available reports from the server.
 
@@ -205,16 +356,9 @@ class Report(object):
         :return: `list` of dictionaries
         :raise: `urllib.error.URLError` (connection error)
         """
-        report_model = "ir.actions.report"
-        if v(self._odoo.version)[0] < 11:
-            report_model = "ir.actions.report.xml"
-        IrReport = self._odoo.env[report_model]
-        report_ids = IrReport.search([])
-        reports = IrReport.read(
-            report_ids, ["name", "model", "report_name", "report_type"]
-        )
         result = {}
-        for report in reports:
+        for report in self._get_reports()[0]:
+            report = dict(report)
             model = report.pop("model")
             report.pop("id")
             if model not in result:
@@ -8,8 +8,9 @@ Web controllers of `Odoo` expose two kinds of methods: `json` and `http`.
 These methods can be accessed from the connectors of this module.
 """
 import sys
+import time
 
-from odoorpc.rpc import error, jsonrpclib
+from odoorpc.rpc import balancer, error, jsonrpclib
 
 # Python 2
 if sys.version_info[0] < 3:
@@ -20,6 +21,11 @@ else:
     from http.cookiejar import CookieJar
     from urllib.request import HTTPCookieProcessor, build_opener
 
+# Server versions detected by connectors are shared between them during
+# VERSION_CACHE_TTL seconds: {(ssl, host, port): (version, timestamp)}
+VERSION_CACHE_TTL = 300
+_VERSIONS = {}
+
 
 class Connector(object):
     """Connector base class defining the interface used
@@ -204,16 +210,34 @@ class ConnectorJSONRPC(Connector):
         self.deserialize = deserialize
         # One URL opener (with cookies handling) shared between
         # JSON and HTTP requests
+        self._cookie_jar = None
         if opener is None:
-            cookie_jar = CookieJar()
-            opener = build_opener(HTTPCookieProcessor(cookie_jar))
+            self._cookie_jar = CookieJar()
+            opener = build_opener(HTTPCookieProcessor(self._cookie_jar))
         self._opener = opener
         self._proxy_json, self._proxy_http = self._get_proxies()
 
+    def reset(self):
+        """Replace the URL opener and the proxies inherited from the parent
+        process after a fork, so that no connection or lock is shared with
+        it. The cookies (the web session) are kept, as well as the timeout
+        and the retry policy.
+        """
+        if self._cookie_jar is not None:
+            # Iterating on the cookies does not acquire the lock of the jar,
+            # which could have been held by another thread during the fork
+            cookie_jar = CookieJar()
+            for cookie in self._cookie_jar:
+                cookie_jar.set_cookie(cookie)
+            self._cookie_jar = cookie_jar
+            self._opener = build_opener(HTTPCookieProcessor(cookie_jar))
+        timeout, retry = self.timeout, self.retry
+        self._proxy_json, self._proxy_http = self._get_proxies()
+        self.timeout, self.retry = timeout, retry
+
     def _get_proxies(self):
         """Returns the :class:`ProxyJSON <odoorpc.rpc.jsonrpclib.ProxyJSON>`
-        and :class:`ProxyHTTP <odoorpc.rpc.jsonrpclib.ProxyHTTP>` instances
-        corresponding to the server version used.
+        and :class:`ProxyHTTP <odoorpc.rpc.jsonrpclib.ProxyHTTP>` instances.
         """
         proxy_json = jsonrpclib.ProxyJSON(
             self.host,
@@ -230,13 +254,37 @@ class ConnectorJSONRPC(Connector):
             ssl=self.ssl,
             opener=self._opener,
         )
-        # Detect the server version
-        if self.version is None:
-            result = proxy_json("/web/webclient/version_info")["result"]
-            if "server_version" in result:
-                self.version = result["server_version"]
         return proxy_json, proxy_http
 
+    @property
+    def version(self):
+        """The version of the server. If it has not been supplied, it is
+        detected the first time it is needed, and shared with other connectors
+        targeting the same server during ``VERSION_CACHE_TTL`` seconds.
+        """
+        if self._version is None:
+            self._version = self._detect_version()
+        return self._version
+
+    @version.setter
+    def version(self, version):
+        self._version = version
+
+    def _detect_version(self):
+        """Return the version of the server (`None` if it can not be
+        detected).
+        """
+        # The host of multi-hosts connectors is a list
+        key = (self.ssl, tuple(balancer.parse_endpoints(self.host, self.port)))
+        cached = _VERSIONS.get(key)
+        if cached and time.time() - cached[1] < VERSION_CACHE_TTL:
+            return cached[0]
+        result = self._proxy_json("/web/webclient/version_info")["result"]
+        version = result.get("server_version")
+        if version:
+            _VERSIONS[key] = (version, time.time())
+        return version
+
     @property
     def proxy_json(self):
         """Return the JSON proxy."""
@@ -258,6 +306,19 @@ class ConnectorJSONRPC(Connector):
         self._proxy_json._timeout = timeout
         self._proxy_http._timeout = timeout
 
+    @property
+    def retry(self):
+        """Return the retry policy of JSON requests
+        (:class:`RetryPolicy <odoorpc.rpc.retry.RetryPolicy>`), `None` if
+        failed requests are not sent again.
+        """
+        return self._proxy_json._retry
+
+    @retry.setter
+    def retry(self, retry):
+        """Set the retry policy."""
+        self._proxy_json._retry = retry
+
 
 class ConnectorJSONRPCSSL(ConnectorJSONRPC):
     """Connector class using the `JSON-RPC` protocol over `SSL`.
@@ -286,13 +347,104 @@ class ConnectorJSONRPCSSL(ConnectorJSONRPC):
         opener=None,
     ):
         super(ConnectorJSONRPCSSL, self).__init__(
-            host, port, timeout, version, opener=opener
+            host, port, timeout, version, deserialize=deserialize, opener=opener
         )
+
+    @property
+    def ssl(self):
+        return True
+
+
+class ConnectorJSONRPCMulti(ConnectorJSONRPC):
+    """Connector class using the `JSON-RPC` protocol to communicate with
+    several servers (e.g. the workers of a cluster sharing the same database).
+    Servers are given as a list or a comma-separated string of hosts,
+    optionally followed by their port (`port` is used by default):
+
+    .. doctest::
+        :options: +SKIP
+
+        >>> from odoorpc import rpc
+        >>> cnt = rpc.ConnectorJSONRPCMulti('host1:8069,host2:8069,host3')
+
+    Requests are spread between servers by a
+    :class:`Balancer <odoorpc.rpc.balancer.Balancer>` (least requests in
+    progress), which ejects temporarily the servers which are unavailable.
+    Requests to web controllers are sent to the same server, where the web
+    session is opened.
+
+    .. doctest::
+        :options: +SKIP
+
+        >>> cnt.balancer.stats
+        [{'host': 'host1', 'port': 8069, 'pending': 0, 'requests': 42, 'errors': 0, 'ejected': False},
+         ...]
+    """
+
+    connector_class = ConnectorJSONRPC
+
+    def __init__(
+        self,
+        host,
+        port=8069,
+        timeout=120,
+        version=None,
+        deserialize=True,
+        opener=None,
+        max_failures=1,
+        eject_time=30,
+    ):
+        Connector.__init__(self, host, port, timeout, version)
+        self.deserialize = deserialize
+        # Each connector uses its own cookies unless an opener is supplied
+        self._opener = opener
+        connectors = [
+            self.connector_class(
+                endpoint_host,
+                endpoint_port,
+                timeout,
+                version,
+                deserialize=deserialize,
+                opener=opener,
+            )
+            for endpoint_host, endpoint_port in balancer.parse_endpoints(host, port)
+        ]
+        self.balancer = balancer.Balancer(
+            connectors, max_failures=max_failures, eject_time=eject_time
+        )
+        self._proxy_json, self._proxy_http = self._get_proxies()
+
+    def reset(self):
+        """Reset the connectors to each server and the state of the balancer
+        after a fork (see :func:`ConnectorJSONRPC.reset`).
+        """
+        self.balancer.reset()
+        timeout, retry = self.timeout, self.retry
         self._proxy_json, self._proxy_http = self._get_proxies()
+        self.timeout, self.retry = timeout, retry
+
+    def _get_proxies(self):
+        """Returns the proxies spreading requests between servers."""
+        proxy_json = balancer.BalancedProxyJSON(self.balancer, self._timeout)
+        proxy_http = balancer.BalancedProxyHTTP(self.balancer, self._timeout)
+        return proxy_json, proxy_http
+
+
+class ConnectorJSONRPCSSLMulti(ConnectorJSONRPCMulti):
+    """Connector class using the `JSON-RPC` protocol over `SSL` to
+    communicate with several servers (see :class:`ConnectorJSONRPCMulti`).
+    """
+
+    connector_class = ConnectorJSONRPCSSL
 
     @property
     def ssl(self):
         return True
 
 
-PROTOCOLS = {"jsonrpc": ConnectorJSONRPC, "jsonrpc+ssl": ConnectorJSONRPCSSL}
+PROTOCOLS = {
+    "jsonrpc": ConnectorJSONRPC,
+    "jsonrpc+ssl": ConnectorJSONRPCSSL,
+    "jsonrpc+multi": ConnectorJSONRPCMulti,
+    "jsonrpc+ssl+multi": ConnectorJSONRPCSSLMulti,
+}
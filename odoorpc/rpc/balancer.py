@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+# Copyright 2014 Sébastien Alix
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl)
+"""Provides the :class:`Balancer` class used by multi-host connectors to
+spread requests between several servers, and the related proxies.
+"""
+import logging
+import socket
+import sys
+import threading
+import time
+
+from odoorpc.rpc.jsonrpclib import URLBuilder
+from odoorpc.rpc.retry import RETRY_HTTP_CODES
+
+# Python 2
+if sys.version_info[0] < 3:
+    from urllib2 import HTTPError, URLError
+# Python >= 3
+else:
+    from urllib.error import HTTPError, URLError
+
+logger = logging.getLogger(__name__)
+
+
+def parse_endpoints(host, port):
+    """Return the list of `(host, port)` endpoints defined by `host`, a list
+    or a comma-separated string of hosts optionally followed by their port
+    (``'host1:8069,host2:8069'``). `port` is used by default.
+    """
+    if not isinstance(host, (list, tuple)):
+        host = [elt.strip() for elt in host.split(",") if elt.strip()]
+    endpoints = []
+    for elt in host:
+        if isinstance(elt, (list, tuple)):
+            endpoints.append((elt[0], int(elt[1])))
+            continue
+        name, sep, elt_port = elt.rpartition(":")
+        if sep and elt_port.isdigit() and not name.endswith(":"):
+            endpoints.append((name.strip("[]"), int(elt_port)))
+        else:
+            endpoints.append((elt, int(port)))
+    return endpoints
+
+
+def is_failure(exc):
+    """Return `True` if the exception `exc` raised by a request means that
+    the server is unavailable.
+    """
+    if isinstance(exc, HTTPError):
+        return exc.code in RETRY_HTTP_CODES
+    return isinstance(exc, (URLError, socket.error, socket.timeout))
+
+
+class Endpoint(object):
+    """A server of a :class:`Balancer`, with its connector and state."""
+
+    def __init__(self, connector):
+        self.connector = connector
+        self.pending = 0  # Requests in progress
+        self.requests = 0
+        self.errors = 0
+        self.failures = 0  # Consecutive failures
+        self.ejected_until = 0
+
+
+class Balancer(object):
+    """Spread requests between several `connectors` (one per server).
+
+    Each request is sent to the server with the least requests in progress
+    among the available ones. A server is ejected during `eject_time`
+    seconds once `max_failures` consecutive requests sent to it failed
+    because it was unavailable (connection error, 502/503/504 responses).
+    If all servers are ejected, the one ejected first is used.
+
+    Requests to web controllers (``/web/...``) depend on the session opened
+    on a server: they are all sent to the same server as long as it is
+    available (affinity).
+    """
+
+    def __init__(self, connectors, max_failures=1, eject_time=30):
+        if not connectors:
+            raise ValueError("At least one connector is required")
+        self.endpoints = [Endpoint(connector) for connector in connectors]
+        self.max_failures = max_failures
+        self.eject_time = eject_time
+        self._affinity = None
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, affinity=False):
+        """Return the endpoint to use for a new request, which is counted as
+        in progress until :func:`release` is called.
+        """
+        with self._lock:
+            now = time.time()
+            endpoint = None
+            if affinity and self._affinity and self._affinity.ejected_until <= now:
+                endpoint = self._affinity
+            else:
+                candidates = [e for e in self.endpoints if e.ejected_until <= now]
+                if not candidates:
+                    candidates = [min(self.endpoints, key=lambda e: e.ejected_until)]
+                # Least requests in progress, ties broken in turn
+                self._next = (self._next + 1) % len(candidates)
+                candidates = candidates[self._next :] + candidates[: self._next]
+                endpoint = min(candidates, key=lambda e: e.pending)
+                if affinity:
+                    self._affinity = endpoint
+            endpoint.pending += 1
+            return endpoint
+
+    def release(self, endpoint, exc=None):
+        """Mark the request sent to `endpoint` as done, `exc` being the
+        exception it raised if any.
+        """
+        with self._lock:
+            endpoint.pending -= 1
+            endpoint.requests += 1
+            if exc is None or not is_failure(exc):
+                endpoint.failures = 0
+                return
+            endpoint.errors += 1
+            endpoint.failures += 1
+            if endpoint.failures >= self.max_failures:
+                endpoint.failures = 0
+                endpoint.ejected_until = time.time() + self.eject_time
+                logger.warning(
+                    "Server %s:%s ejected for %ss (%s)",
+                    endpoint.connector.host,
+                    endpoint.connector.port,
+                    self.eject_time,
+                    exc,
+                )
+
+    @property
+    def stats(self):
+        """Statistics of each server (a list of dictionaries)."""
+        with self._lock:
+            now = time.time()
+            return [
+                {
+                    "host": endpoint.connector.host,
+                    "port": endpoint.connector.port,
+                    "pending": endpoint.pending,
+                    "requests": endpoint.requests,
+                    "errors": endpoint.errors,
+                    "ejected": endpoint.ejected_until > now,
+                }
+                for endpoint in self.endpoints
+            ]
+
+    def reset(self):
+        """Reset the lock, the requests in progress and the connectors after
+        a fork (requests sent by the parent process are not tracked).
+        """
+        self._lock = threading.Lock()
+        for endpoint in self.endpoints:
+            endpoint.pending = 0
+            endpoint.connector.reset()
+
+    def set_timeout(self, timeout):
+        """Set the timeout of all connectors."""
+        for endpoint in self.endpoints:
+            endpoint.connector.timeout = timeout
+
+
+class BalancedProxy(object):
+    """Base class of proxies sending requests through a :class:`Balancer`."""
+
+    def __init__(self, balancer, timeout=120):
+        self._balancer = balancer
+        self._builder = URLBuilder(self)
+        self._timeout_value = timeout
+
+    def __getattr__(self, name):
+        return getattr(self._builder, name)
+
+    def __getitem__(self, url):
+        return self._builder[url]
+
+    @property
+    def _timeout(self):
+        return self._timeout_value
+
+    @_timeout.setter
+    def _timeout(self, timeout):
+        self._timeout_value = timeout
+        self._balancer.set_timeout(timeout)
+
+    def _send(self, affinity, request):
+        """Send a request with the ``request(connector)`` function, through
+        the selected connector.
+        """
+        endpoint = self._balancer.acquire(affinity=affinity)
+        try:
+            result = request(endpoint.connector)
+        except Exception as exc:
+            self._balancer.release(endpoint, exc)
+            raise
+        self._balancer.release(endpoint)
+        return result
+
+
+class BalancedProxyJSON(BalancedProxy):
+    """Equivalent of :class:`ProxyJSON <odoorpc.rpc.jsonrpclib.ProxyJSON>`
+    spreading requests between several servers.
+    """
+
+    def __init__(self, balancer, timeout=120, retry=None):
+        super(BalancedProxyJSON, self).__init__(balancer, timeout)
+        self._retry = retry
+
+    def __call__(self, url, params=None):
+        if params is None:
+            params = {}
+        if self._retry:
+            return self._retry.call(self._request, url, params)
+        return self._request(url, params)
+
+    def _request(self, url, params):
+        affinity = url.lstrip("/").startswith("web/")
+        return self._send(
+            affinity, lambda connector: connector.proxy_json._request(url, params)
+        )
+
+    def stream(self, url, params=None):
+        """Stream the elements of the result of a request (see
+        :func:`ProxyJSON.stream <odoorpc.rpc.jsonrpclib.ProxyJSON.stream>`),
+        the request being in progress until the iteration ends.
+        """
+        affinity = url.lstrip("/").startswith("web/")
+        endpoint = self._balancer.acquire(affinity=affinity)
+        exc = None
+        try:
+            for element in endpoint.connector.proxy_json.stream(url, params):
+                yield element
+        except Exception as exc_:
+            exc = exc_
+            raise
+        finally:
+            self._balancer.release(endpoint, exc)
+
+
+class BalancedProxyHTTP(BalancedProxy):
+    """Equivalent of :class:`ProxyHTTP <odoorpc.rpc.jsonrpclib.ProxyHTTP>`
+    spreading requests between several servers.
+    """
+
+    def __call__(self, url, data=None, headers=None):
+        return self._send(
+            True, lambda connector: connector.proxy_http(url, data, headers)
+        )
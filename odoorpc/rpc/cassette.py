@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+# Copyright 2014 Sébastien Alix
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl)
+"""Provides the :class:`ConnectorCassette` class to record the JSON requests
+sent to a server with their responses, and replay them later without any
+server.
+"""
+import collections
+import gzip
+import hashlib
+import json
+import threading
+import time
+
+from odoorpc.rpc import error
+from odoorpc.rpc.jsonrpclib import URLBuilder, get_json_log_data
+
+MODES = ("record", "replay")
+
+
+def get_fingerprint(url, params):
+    """Return the fingerprint identifying a request to `url` with `params`,
+    secrets being masked (see :class:`Secret
+    <odoorpc.rpc.jsonrpclib.Secret>`).
+    """
+    data = [url.lstrip("/"), get_json_log_data(params or {})]
+    data = json.dumps(data, sort_keys=True, default=repr)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+class ConnectorCassette(object):
+    """Connector recording the JSON requests sent through another
+    `connector` with their responses and durations (``mode='record'``),
+    or replaying them from the cassette file `path` without any server
+    (``mode='replay'``).
+
+    The cassette is a gzipped file of JSON lines, in which secrets (such
+    as passwords) are masked. Record a session by supplying the connector
+    to the :class:`ODOO <odoorpc.ODOO>` class:
+
+    .. doctest::
+        :options: +SKIP
+
+        >>> import odoorpc
+        >>> from odoorpc.rpc import ConnectorJSONRPC
+        >>> from odoorpc.rpc.cassette import ConnectorCassette
+        >>> cassette = ConnectorCassette(
+        ...     'session.jsonl.gz', ConnectorJSONRPC('localhost', 8069))
+        >>> odoo = odoorpc.ODOO('localhost', port=8069, connector=cassette)
+        >>> odoo.login('db_name', 'admin', 'password')
+        >>> odoo.env['res.partner'].search_read([], ['name'])
+        [...]
+        >>> cassette.close()
+
+    And replay it (requests must be sent in the same way to be recognized):
+
+    .. doctest::
+        :options: +SKIP
+
+        >>> cassette = ConnectorCassette('session.jsonl.gz', mode='replay')
+        >>> odoo = odoorpc.ODOO(connector=cassette)
+        >>> odoo.login('db_name', 'admin', 'password')
+        >>> odoo.env['res.partner'].search_read([], ['name'])
+        [...]
+
+    Responses are served by fingerprint of the request (URL and parameters,
+    see :func:`get_fingerprint`), in the order they were recorded if the
+    same request has been sent several times (the last response is then
+    served again). By default they are returned immediately, so that only
+    the time spent by the client is measured. Set `latency` to wait for the
+    recorded duration of each request multiplied by this factor
+    (e.g. `1` to simulate the recorded latency).
+
+    Only JSON requests are recorded: `HTTP` requests (reports, database
+    dumps) are sent through the connector when recording, and are not
+    available when replaying.
+
+    :raise: `ValueError` (wrong mode, no connector to record)
+    :raise: `IOError` (cassette file not found in replay mode)
+    """
+
+    def __init__(self, path, connector=None, mode="record", latency=0):
+        if mode not in MODES:
+            raise ValueError("The mode must be one of {}".format(MODES))
+        if mode == "record" and connector is None:
+            raise ValueError("A connector is required to record requests")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._connector = connector
+        self._lock = threading.Lock()
+        self._version = None
+        self._timeout = connector and connector.timeout or 120
+        self._retry = connector and connector.retry
+        # {fingerprint: deque([(response, duration)])}, responses being kept
+        # serialized, so that replaying them costs as much as receiving them
+        self._responses = {}
+        self._file = None
+        if mode == "record":
+            self._file = gzip.open(path, "wb")
+        else:
+            self._load()
+        self._proxy_json = CassetteProxyJSON(self)
+
+    def _load(self):
+        """Load the responses recorded in the cassette."""
+        with gzip.open(self.path, "rb") as file_:
+            for line in file_:
+                data = json.loads(line.decode("utf-8"))
+                if "version" in data:
+                    self._version = data["version"]
+                    continue
+                fingerprint = get_fingerprint(data["url"], data["params"])
+                responses = self._responses.setdefault(fingerprint, collections.deque())
+                responses.append((json.dumps(data["response"]), data["duration"]))
+
+    def _write(self, data):
+        """Write a line of JSON `data` in the cassette."""
+        line = json.dumps(data, separators=(",", ":"), default=repr) + "\n"
+        with self._lock:
+            self._file.write(line.encode("utf-8"))
+
+    def close(self):
+        """Close the cassette file (the recording is complete only once
+        closed).
+        """
+        if self._file is not None:
+            with self._lock:
+                self._file.close()
+                self._file = None
+
+    def reset(self):
+        """Reset the recorded connector after a fork (see
+        :func:`ConnectorJSONRPC.reset <odoorpc.rpc.ConnectorJSONRPC.reset>`).
+        """
+        self._lock = threading.Lock()
+        if self._connector is not None:
+            self._connector.reset()
+
+    @property
+    def host(self):
+        """Host of the recorded connector (`None` when replaying)."""
+        return self._connector and self._connector.host
+
+    @property
+    def port(self):
+        """Port of the recorded connector (`None` when replaying)."""
+        return self._connector and self._connector.port
+
+    @property
+    def ssl(self):
+        return bool(self._connector and self._connector.ssl)
+
+    @property
+    def version(self):
+        """The version of the server, recorded in the cassette."""
+        if self._version is None and self._connector is not None:
+            self.version = self._connector.version
+        return self._version
+
+    @version.setter
+    def version(self, version):
+        self._version = version
+        if version and self.mode == "record":
+            self._write({"version": version})
+
+    @property
+    def proxy_json(self):
+        """Return the JSON proxy."""
+        return self._proxy_json
+
+    @property
+    def proxy_http(self):
+        """Return the HTTP proxy of the recorded connector.
+
+        :raise: :class:`odoorpc.rpc.error.ConnectorError` (replay mode)
+        """
+        if self._connector is None:
+            raise error.ConnectorError("HTTP requests can not be replayed")
+        return self._connector.proxy_http
+
+    @property
+    def timeout(self):
+        """Return the timeout."""
+        return self._timeout
+
+    @timeout.setter
+    def timeout(self, timeout):
+        """Set the timeout."""
+        self._timeout = timeout
+        if self._connector is not None:
+            self._connector.timeout = timeout
+
+    @property
+    def retry(self):
+        """Return the retry policy of the recorded connector."""
+        return self._retry
+
+    @retry.setter
+    def retry(self, retry):
+        """Set the retry policy."""
+        self._retry = retry
+        if self._connector is not None:
+            self._connector.retry = retry
+
+    def record(self, url, params):
+        """Send the request through the recorded connector, and record it
+        with its response.
+        """
+        start = time.time()
+        response = self._connector.proxy_json(url, params)
+        self._write(
+            {
+                "url": url,
+                "params": get_json_log_data(params),
+                "response": response,
+                "duration": round(time.time() - start, 6),
+            }
+        )
+        return response
+
+    def record_stream(self, url, params):
+        """Stream the result of the request sent through the recorded
+        connector, and record it once entirely received (the elements
+        are kept in memory in the meantime).
+        """
+        start = time.time()
+        elements = []
+        try:
+            for element in self._connector.proxy_json.stream(url, params):
+                elements.append(element)
+                yield element
+        except error.ConnectorError as exc:
+            response = {"jsonrpc": "2.0", "error": exc.odoo_traceback}
+        else:
+            response = {"jsonrpc": "2.0", "result": elements}
+        self._write(
+            {
+                "url": url,
+                "params": get_json_log_data(params),
+                "response": response,
+                "duration": round(time.time() - start, 6),
+            }
+        )
+        if "error" in response:
+            raise error.ConnectorError(
+                response["error"]["data"]["message"], response["error"]
+            )
+
+    def replay_stream(self, url, params):
+        """Return a generator of the elements of the result recorded for the
+        request to `url` with `params`.
+        """
+        response = self.replay(url, params)
+        if response.get("error"):
+            raise error.ConnectorError(
+                response["error"]["data"]["message"], response["error"]
+            )
+        for element in response["result"]:
+            yield element
+
+    def replay(self, url, params):
+        """Return the response recorded for the request to `url` with
+        `params`.
+
+        :raise: :class:`odoorpc.rpc.error.ConnectorError` (request not
+            recorded)
+        """
+        fingerprint = get_fingerprint(url, params)
+        with self._lock:
+            responses = self._responses.get(fingerprint)
+            if not responses:
+                raise error.ConnectorError(
+                    "No response recorded for the request to '{}' ({})".format(
+                        url, fingerprint
+                    )
+                )
+            response, duration = responses[0]
+            if len(responses) > 1:
+                responses.popleft()
+        if self.latency:
+            time.sleep(duration * self.latency)
+        return json.loads(response)
+
+
+class CassetteProxyJSON(object):
+    """Equivalent of :class:`ProxyJSON <odoorpc.rpc.jsonrpclib.ProxyJSON>`
+    recording or replaying requests with a :class:`ConnectorCassette`.
+    """
+
+    def __init__(self, cassette):
+        self._cassette = cassette
+        self._builder = URLBuilder(self)
+
+    def __getattr__(self, name):
+        return getattr(self._builder, name)
+
+    def __getitem__(self, url):
+        return self._builder[url]
+
+    def __call__(self, url, params=None):
+        if params is None:
+            params = {}
+        if self._cassette.mode == "record":
+            return self._cassette.record(url, params)
+        return self._cassette.replay(url, params)
+
+    def stream(self, url, params=None):
+        if params is None:
+            params = {}
+        if self._cassette.mode == "record":
+            return self._cassette.record_stream(url, params)
+        return self._cassette.replay_stream(url, params)
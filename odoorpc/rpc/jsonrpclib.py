@@ -2,12 +2,16 @@
 # Copyright 2014 Sébastien Alix
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl)
 """Provides the :class:`ProxyJSON` class for JSON-RPC requests."""
+import codecs
 import copy
 import json
 import logging
 import random
+import re
 import sys
 
+from odoorpc.rpc import error
+
 # Python 2
 if sys.version_info[0] < 3:
     from cookielib import CookieJar
@@ -60,6 +64,12 @@ LOG_JSON_SEND_MSG = "(JSON,send) %(url)s %(data)s"
 LOG_JSON_RECV_MSG = "(JSON,recv) %(url)s %(data)s => %(result)s"
 LOG_HTTP_SEND_MSG = "(HTTP,send) %(url)s%(data)s"
 LOG_HTTP_RECV_MSG = "(HTTP,recv) %(url)s%(data)s => %(result)s"
+LOG_JSON_STREAM_MSG = "(JSON,stream) %(url)s %(data)s => %(count)s elements"
+
+# Size of the chunks read from streamed responses
+STREAM_CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
 
 logger = logging.getLogger(__name__)
 
@@ -71,8 +81,8 @@ def _hide_parameters(data):
             value = data[key]
             data[key] = _hide_parameters(value)
     elif isinstance(data, list):
-        for e in data:
-            data[data.index(e)] = _hide_parameters(e)
+        for index, e in enumerate(data):
+            data[index] = _hide_parameters(e)
     elif isinstance(data, tuple):
         # Replace tuple by list (mutable)
         new_data = []
@@ -93,6 +103,112 @@ def get_json_log_data(data):
     return log_data
 
 
+class JSONStream(object):
+    """Parse incrementally the JSON-RPC response read from the file-like
+    object `response`, to iterate on the elements of its `result` array
+    without loading the whole response (see :func:`ProxyJSON.stream`).
+    """
+
+    def __init__(self, response, chunk_size=STREAM_CHUNK_SIZE):
+        self._response = response
+        self._chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _read(self, size):
+        """Read at least `size` more bytes of the response, return `False`
+        once it has been read entirely.
+        """
+        if self._eof:
+            return False
+        chunk = self._response.read(size)
+        if not chunk:
+            self._eof = True
+        # Drop the data already parsed
+        self._buffer = self._buffer[self._pos :] + self._decoder.decode(
+            chunk, final=self._eof
+        )
+        self._pos = 0
+        return not self._eof
+
+    def _peek(self):
+        """Return the next character which is not a whitespace (an empty
+        string at the end of the response).
+        """
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read(self._chunk_size):
+                return ""
+
+    def _expect(self, chars):
+        """Consume the next character, which has to be one of `chars`."""
+        char = self._peek()
+        if not char or char not in chars:
+            raise ValueError(
+                "Expecting one of {!r} in the JSON-RPC response, got {!r}".format(
+                    chars, char
+                )
+            )
+        self._pos += 1
+        return char
+
+    def _decode(self):
+        """Decode the next JSON value."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                # Incomplete value: read at least as much data as buffered,
+                # so that large values are decoded in linear time
+                if self._read(max(self._chunk_size, len(self._buffer))):
+                    continue
+                raise
+            # A number could be truncated at the end of the buffer
+            if end == len(self._buffer) and self._read(self._chunk_size):
+                continue
+            self._pos = end
+            return value
+
+    def __iter__(self):
+        """Iterate on the elements of the `result` array.
+
+        :raise: :class:`odoorpc.rpc.error.ConnectorError` (the response
+            contains an error, available in the `odoo_traceback` attribute)
+        :raise: `ValueError` (invalid JSON)
+        """
+        members = {}
+        self._expect("{")
+        while self._peek() != "}":
+            key = self._decode()
+            self._expect(":")
+            if key == "result" and self._peek() == "[":
+                self._pos += 1
+                if self._peek() == "]":
+                    self._pos += 1
+                else:
+                    while True:
+                        yield self._decode()
+                        if self._expect(",]") == "]":
+                            break
+            else:
+                members[key] = self._decode()
+            if self._peek() != "}":
+                self._expect(",")
+        self._expect("}")
+        if members.get("error"):
+            raise error.ConnectorError(
+                members["error"]["data"]["message"], members["error"]
+            )
+        if "result" in members:
+            yield members["result"]
+
+
 class Proxy(object):
     """Base class to implement a proxy to perform requests."""
 
@@ -123,14 +239,55 @@ class ProxyJSON(Proxy):
     """
 
     def __init__(
-        self, host, port, timeout=120, ssl=False, opener=None, deserialize=True
+        self,
+        host,
+        port,
+        timeout=120,
+        ssl=False,
+        opener=None,
+        deserialize=True,
+        retry=None,
     ):
         Proxy.__init__(self, host, port, timeout, ssl, opener)
         self._deserialize = deserialize
+        self._retry = retry
 
     def __call__(self, url, params=None):
         if params is None:
             params = {}
+        if self._retry:
+            return self._retry.call(self._request, url, params)
+        return self._request(url, params)
+
+    def stream(self, url, params=None):
+        """Send a request to `url` and return a generator of the elements of
+        the `result` array of the response, parsed while they are received
+        (see :class:`JSONStream`). The request is sent once the iteration
+        starts, and it is not sent again on failure.
+
+        :raise: :class:`odoorpc.rpc.error.ConnectorError` (the response
+            contains an error)
+        """
+        if params is None:
+            params = {}
+        full_url, log_data, response = self._open(url, params)
+        try:
+            count = 0
+            for element in JSONStream(response):
+                count += 1
+                yield element
+            if log_data is not None:
+                logger.debug(
+                    LOG_JSON_STREAM_MSG,
+                    {"url": full_url, "data": log_data, "count": count},
+                )
+        finally:
+            response.close()
+
+    def _open(self, url, params):
+        """Send a request to `url` and return its full URL, the data to log
+        (`None` if not logged) and the response.
+        """
         data = {
             "jsonrpc": "2.0",
             "method": "call",
@@ -140,19 +297,27 @@ class ProxyJSON(Proxy):
         if url.startswith("/"):
             url = url[1:]
         full_url = self._get_full_url(url)
-        log_data = get_json_log_data(data)
-        logger.debug(LOG_JSON_SEND_MSG, {"url": full_url, "data": log_data})
+        # Copying the data to log is expensive on large requests
+        log_data = None
+        if logger.isEnabledFor(logging.DEBUG):
+            log_data = get_json_log_data(data)
+            logger.debug(LOG_JSON_SEND_MSG, {"url": full_url, "data": log_data})
         data_json = json.dumps(data)
         request = Request(url=full_url, data=encode_data(data_json))
         request.add_header("Content-Type", "application/json")
         response = self._opener.open(request, timeout=self._timeout)
+        return full_url, log_data, response
+
+    def _request(self, url, params):
+        full_url, log_data, response = self._open(url, params)
         if not self._deserialize:
             return response
         result = json.load(decode_data(response))
-        logger.debug(
-            LOG_JSON_RECV_MSG,
-            {"url": full_url, "data": log_data, "result": result},
-        )
+        if log_data is not None:
+            logger.debug(
+                LOG_JSON_RECV_MSG,
+                {"url": full_url, "data": log_data, "result": result},
+            )
         return result
 
 
@@ -165,10 +330,9 @@ class ProxyHTTP(Proxy):
         if url.startswith("/"):
             url = url[1:]
         full_url = self._get_full_url(url)
-        logger.debug(
-            LOG_HTTP_SEND_MSG,
-            {"url": full_url, "data": data and " (%s)" % data or ""},
-        )
+        # Data containing a password is supplied as a `Secret`
+        log_data = data and " (%s)" % _hide_parameters(data) or ""
+        logger.debug(LOG_HTTP_SEND_MSG, {"url": full_url, "data": log_data})
         kwargs = {"url": full_url}
         if data:
             kwargs["data"] = encode_data(data)
@@ -180,11 +344,7 @@ class ProxyHTTP(Proxy):
         response = self._opener.open(request, timeout=self._timeout)
         logger.debug(
             LOG_HTTP_RECV_MSG,
-            {
-                "url": full_url,
-                "data": data and " (%s)" % data or "",
-                "result": response,
-            },
+            {"url": full_url, "data": log_data, "result": response},
         )
         return response
 
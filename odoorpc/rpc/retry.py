@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+# Copyright 2014 Sébastien Alix
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl)
+"""Provides the :class:`RetryPolicy` class used by JSON-RPC connectors to send
+again requests which failed because of a transient error.
+"""
+import logging
+import random
+import socket
+import sys
+import threading
+import time
+
+# Python 2
+if sys.version_info[0] < 3:
+    from urllib2 import HTTPError, URLError
+# Python >= 3
+else:
+    from urllib.error import HTTPError, URLError
+
+logger = logging.getLogger(__name__)
+
+# Model methods which do not update any data, and can be sent again safely
+SAFE_METHODS = frozenset(
+    [
+        "check_access_rights",
+        "check_object_reference",
+        "context_get",
+        "default_get",
+        "exists",
+        "fields_get",
+        "fields_view_get",
+        "formatted_read_group",
+        "get_metadata",
+        "get_views",
+        "load_views",
+        "name_get",
+        "name_search",
+        "read",
+        "read_group",
+        "search",
+        "search_count",
+        "search_read",
+        "web_read",
+        "web_search_read",
+        "xmlid_to_res_model_res_id",
+    ]
+)
+
+# Methods of other services (`common`, `db`) which can be sent again safely
+SAFE_SERVICE_METHODS = frozenset(
+    [
+        "about",
+        "authenticate",
+        "db_exist",
+        "list",
+        "list_countries",
+        "list_lang",
+        "login",
+        "server_version",
+        "version",
+    ]
+)
+
+# URLs which can be requested again safely
+SAFE_URLS = frozenset(
+    [
+        "web/database/list",
+        "web/session/authenticate",
+        "web/session/get_session_info",
+        "web/webclient/version_info",
+    ]
+)
+
+# HTTP status codes returned by proxies when the server is unavailable
+RETRY_HTTP_CODES = frozenset([502, 503, 504])
+
+# Names of server errors raised when a transaction has been rolled back
+# because of a concurrent one (such requests can always be sent again)
+CONCURRENCY_ERRORS = (
+    "ConcurrencyError",
+    "DeadlockDetected",
+    "SerializationFailure",
+    "TransactionRollbackError",
+)
+
+
+class RetryPolicy(object):
+    """Define which requests are sent again when they fail, and how long
+    to wait before each attempt.
+
+    Requests calling methods which do not update data (see `methods`) are
+    sent again on connection errors (or if the `HTTP` status code is
+    among `http_codes`), and all requests are sent again if the server
+    reports a concurrency error (the transaction has been rolled back).
+    At most `max_retries` attempts are made, the delay before each one
+    being drawn randomly between zero and ``backoff * 2 ** attempt``
+    seconds (exponential backoff with jitter) capped to `max_backoff`:
+
+    .. doctest::
+        :options: +SKIP
+
+        >>> from odoorpc.rpc.retry import RetryPolicy
+        >>> odoo.config['retry'] = RetryPolicy(max_retries=5)
+        >>> odoo.config['retry'].counters
+        {'attempts': 0, 'recovered': 0, 'exhausted': 0,
+         'connection': 0, 'http': 0, 'concurrency': 0}
+
+    A policy can be shared by several connections, its counters are
+    protected by a lock. It can be pickled with the counters, but not the
+    lock.
+    """
+
+    def __init__(
+        self,
+        max_retries=3,
+        backoff=0.5,
+        max_backoff=30,
+        methods=SAFE_METHODS,
+        http_codes=RETRY_HTTP_CODES,
+        concurrency_errors=CONCURRENCY_ERRORS,
+    ):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.methods = frozenset(methods)
+        self.http_codes = frozenset(http_codes)
+        self.concurrency_errors = tuple(concurrency_errors)
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ["attempts", "recovered", "exhausted", "connection", "http", "concurrency"],
+            0,
+        )
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def counters(self):
+        """Counters of the policy (a copy):
+
+        - ``attempts``: requests sent again
+        - ``recovered``: requests which succeeded after being sent again
+        - ``exhausted``: requests which still failed after `max_retries`
+          attempts
+        - ``connection``, ``http``, ``concurrency``: errors which led to an
+          attempt, by kind
+        """
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self):
+        """Reset the counters."""
+        with self._lock:
+            for key in self._counters:
+                self._counters[key] = 0
+
+    def _count(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._counters[key] += 1
+
+    def delay(self, attempt):
+        """Return the delay in seconds to wait before the attempt number
+        `attempt` (starting at 0).
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    def is_safe(self, url, params):
+        """Return `True` if the request to `url` with `params` does not update
+        any data.
+        """
+        url = url.lstrip("/")
+        params = params or {}
+        if url == "jsonrpc":
+            args = params.get("args") or []
+            if params.get("service") == "object":
+                return (
+                    params.get("method") in ("execute", "execute_kw")
+                    and len(args) > 4
+                    and args[4] in self.methods
+                )
+            return params.get("method") in SAFE_SERVICE_METHODS
+        if url.startswith("web/dataset/call"):
+            return params.get("method") in self.methods
+        return url in SAFE_URLS
+
+    def get_error_kind(self, exc=None, response=None):
+        """Return the kind of error (``'connection'``, ``'http'`` or
+        ``'concurrency'``) raised by a request (`exc`) or returned by the
+        server (the `response` data), `None` if it is not a transient error.
+        """
+        if exc is not None:
+            if isinstance(exc, HTTPError):
+                return exc.code in self.http_codes and "http" or None
+            if isinstance(exc, (URLError, socket.error, socket.timeout)):
+                return "connection"
+            return None
+        error = isinstance(response, dict) and response.get("error")
+        if error:
+            name = (error.get("data") or {}).get("name") or ""
+            if any(err in name for err in self.concurrency_errors):
+                return "concurrency"
+        return None
+
+    def call(self, func, url, params):
+        """Call ``func(url, params)`` which sends a request, until it succeeds
+        or `max_retries` attempts have been made.
+        """
+        safe = self.is_safe(url, params)
+        attempt = 0
+        while True:
+            exc = response = None
+            try:
+                response = func(url, params)
+                kind = self.get_error_kind(response=response)
+            except Exception as exc_:
+                exc = exc_
+                kind = safe and self.get_error_kind(exc=exc) or None
+            if kind is None:
+                if attempt and exc is None:
+                    self._count("recovered")
+                if exc is not None:
+                    raise exc
+                return response
+            if attempt >= self.max_retries:
+                self._count("exhausted")
+                if exc is not None:
+                    raise exc
+                return response
+            delay = self.delay(attempt)
+            logger.debug(
+                "Request to '%s' failed (%s error), attempt %s in %.2fs",
+                url,
+                kind,
+                attempt + 1,
+                delay,
+            )
+            self._count("attempts", kind)
+            time.sleep(delay)
+            attempt += 1
@@ -4,6 +4,7 @@
 """This module contains some helper functions used to save and load sessions
 in `OdooRPC`.
 """
+import json
 import os
 import stat
 import sys
@@ -16,6 +17,30 @@ else:
     from configparser import ConfigParser
 
 
+def _get_session(conf, name):
+    """Return the session configuration `name` read from `conf`.
+    The `uid`, `context` and `version` keys are only returned if the state
+    of the session has been saved (warm start).
+    """
+    data = {
+        "type": conf.get(name, "type"),
+        "host": conf.get(name, "host"),
+        "protocol": conf.get(name, "protocol"),
+        "port": conf.getint(name, "port"),
+        "timeout": conf.getfloat(name, "timeout"),
+        "user": conf.get(name, "user"),
+        "passwd": conf.get(name, "passwd"),
+        "database": conf.get(name, "database"),
+    }
+    if conf.has_option(name, "uid"):
+        data["uid"] = conf.getint(name, "uid")
+    if conf.has_option(name, "context"):
+        data["context"] = json.loads(conf.get(name, "context"))
+    if conf.has_option(name, "version"):
+        data["version"] = conf.get(name, "version")
+    return data
+
+
 def get_all(rc_file="~/.odoorpcrc"):
     """Return all session configurations from the `rc_file` file.
 
@@ -58,16 +83,7 @@ def get_all(rc_file="~/.odoorpcrc"):
     conf.read([os.path.expanduser(rc_file)])
     sessions = {}
     for name in conf.sections():
-        sessions[name] = {
-            "type": conf.get(name, "type"),
-            "host": conf.get(name, "host"),
-            "protocol": conf.get(name, "protocol"),
-            "port": conf.getint(name, "port"),
-            "timeout": conf.getfloat(name, "timeout"),
-            "user": conf.get(name, "user"),
-            "passwd": conf.get(name, "passwd"),
-            "database": conf.get(name, "database"),
-        }
+        sessions[name] = _get_session(conf, name)
     return sessions
 
 
@@ -115,16 +131,7 @@ def get(name, rc_file="~/.odoorpcrc"):
     conf.read([os.path.expanduser(rc_file)])
     if not conf.has_section(name):
         raise ValueError("'{}' session does not exist in {}".format(name, rc_file))
-    return {
-        "type": conf.get(name, "type"),
-        "host": conf.get(name, "host"),
-        "protocol": conf.get(name, "protocol"),
-        "port": conf.getint(name, "port"),
-        "timeout": conf.getfloat(name, "timeout"),
-        "user": conf.get(name, "user"),
-        "passwd": conf.get(name, "passwd"),
-        "database": conf.get(name, "database"),
-    }
+    return _get_session(conf, name)
 
 
 def save(name, data, rc_file="~/.odoorpcrc"):
@@ -148,16 +155,30 @@ def save(name, data, rc_file="~/.odoorpcrc"):
         ...     {'type': 'ODOO', 'host': HOST, 'protocol': PROTOCOL,
         ...      'port': PORT, 'timeout': 120, 'database': DB,
         ...      'user': USER, 'passwd': PWD})
+
+    The state of the session can be saved too with the optional `uid`,
+    `context` and `version` keys, in order to restore it later without
+    any login request (see :func:`odoorpc.ODOO.save`).
+    The file is only readable and writable by its owner.
     """
     conf = ConfigParser()
     conf.read([os.path.expanduser(rc_file)])
     if not conf.has_section(name):
         conf.add_section(name)
+    # Do not keep the state of a previous session
+    for key in ("uid", "context", "version"):
+        if key not in data:
+            conf.remove_option(name, key)
     for key in data:
         value = data[key]
+        if key == "context":
+            value = json.dumps(value, sort_keys=True)
         conf.set(name, key, str(value))
-    with open(os.path.expanduser(rc_file), "w") as file_:
-        os.chmod(os.path.expanduser(rc_file), stat.S_IREAD | stat.S_IWRITE)
+    # Create the file with restricted permissions before writing credentials
+    path = os.path.expanduser(rc_file)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.chmod(path, stat.S_IREAD | stat.S_IWRITE)
+    with os.fdopen(fd, "w") as file_:
         conf.write(file_)
 
 
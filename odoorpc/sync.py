@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+# Copyright 2014 Sébastien Alix
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl)
+"""This module provides the :class:`Poller` class to synchronize incrementally
+the records of a model, based on their `write_date`.
+"""
+import datetime
+import json
+import os
+
+WATERMARK_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class Poller(object):
+    """Fetch the records of `model` created or updated since the last poll.
+
+    The position reached (the `write_date` and `id` of the last record
+    returned, called the watermark) is kept between polls, and saved in
+    the JSON `state_file` if supplied so that the next run of your program
+    only transfers the changes:
+
+    .. doctest::
+        :options: +SKIP
+
+        >>> import odoorpc.sync
+        >>> poller = odoorpc.sync.Poller(
+        ...     odoo.env['res.partner'], fields=['name'],
+        ...     state_file='partner.json')
+        >>> for data in poller.poll():
+        ...     print(data)
+        ...
+        {'id': 1, 'name': 'YourCompany', 'write_date': '2024-01-01 10:12:03'}
+        ...
+        >>> list(poller.poll())
+        []
+
+    Records are read by pages of `page_size` records ordered by
+    `write_date` and `id`, each page starting after the watermark (keyset
+    pagination). As `write_date` values are read truncated to the second,
+    the IDs of the records returned during the second of the watermark are
+    kept too, so records sharing the same second are never skipped nor
+    returned twice. The watermark is saved after each page.
+
+    Deleted records can not be detected from their `write_date`. Set
+    `track_deletions` to keep the IDs of the records seen, and call the
+    :func:`deleted` method periodically to get those which no longer exist.
+
+    .. note::
+        Records are filtered with the `domain` supplied and the context of
+        the model, use ``model.with_context(active_test=False)`` to also
+        get the archived records.
+
+    .. note::
+        `Odoo` sets the `write_date` of a record at the beginning of the
+        transaction which updates it: records updated by a transaction still
+        running during a poll could be returned by the next poll only if they
+        are updated again.
+    """
+
+    def __init__(
+        self,
+        model,
+        fields=None,
+        domain=None,
+        page_size=500,
+        state_file=None,
+        track_deletions=False,
+    ):
+        if page_size < 1:
+            raise ValueError("'page_size' must be a positive integer")
+        self._model = model
+        self._fields = fields and list(set(fields) | {"write_date"})
+        self._domain = domain or []
+        self._page_size = page_size
+        self._state_file = state_file and os.path.expanduser(state_file)
+        self._track_deletions = track_deletions
+        self._write_date = self._id = None
+        # IDs of the records returned during the second of the watermark
+        self._seen = set()
+        self._ids = None
+        if self._state_file and os.path.exists(self._state_file):
+            with open(self._state_file) as file_:
+                state = json.load(file_)
+            self._write_date, self._id = state["write_date"], state["id"]
+            # State files saved without these IDs only know the last one
+            self._seen = set(state.get("seen_ids", [self._id]))
+            if state.get("ids") is not None:
+                self._ids = set(state["ids"])
+
+    @property
+    def watermark(self):
+        """The `write_date` and ID of the last record returned,
+        `(None, None)` if no record has been polled yet.
+        """
+        return self._write_date, self._id
+
+    def _get_domain(self):
+        """Return the domain matching the records located after the
+        watermark.
+        """
+        if self._write_date is None:
+            return self._domain
+        # `write_date` values are read truncated to the second while records
+        # are sorted on their microseconds, so the IDs of a same second are
+        # not ordered: the whole second of the watermark is read again,
+        # except the records already returned, and the others must have been
+        # updated at least one second later.
+        next_second = datetime.datetime.strptime(
+            self._write_date, WATERMARK_FORMAT
+        ) + datetime.timedelta(seconds=1)
+        return self._domain + [
+            "|",
+            ("write_date", ">=", next_second.strftime(WATERMARK_FORMAT)),
+            "&",
+            ("write_date", ">=", self._write_date),
+            ("id", "not in", sorted(self._seen)),
+        ]
+
+    def poll(self):
+        """Return a generator of the data of the records created or updated
+        since the last poll (dictionaries as returned by `search_read`).
+
+        The watermark follows the records consumed, so stopping the iteration
+        before its end does not lose any change.
+        """
+        try:
+            while True:
+                records = self._model.search_read(
+                    self._get_domain(),
+                    self._fields,
+                    limit=self._page_size,
+                    order="write_date asc, id asc",
+                )
+                for data in records:
+                    yield data
+                    if data["write_date"] != self._write_date:
+                        self._seen = set()
+                    self._write_date, self._id = data["write_date"], data["id"]
+                    self._seen.add(data["id"])
+                    if self._ids is not None:
+                        self._ids.add(data["id"])
+                self.save()
+                if len(records) < self._page_size:
+                    break
+        finally:
+            self.save()
+
+    def deleted(self):
+        """Return the IDs of records deleted since the previous call,
+        comparing the IDs matching the domain on the server with those
+        already known (this method is available only if `track_deletions`
+        has been set).
+
+        The first call only collects the IDs of the existing records and
+        returns an empty list.
+
+        :raise: `ValueError` (`track_deletions` not set)
+        """
+        if not self._track_deletions:
+            raise ValueError("Deletions are not tracked by this poller")
+        ids = set(self._model.search(self._domain))
+        deleted = sorted(self._ids - ids) if self._ids is not None else []
+        self._ids = ids
+        self.save()
+        return deleted
+
+    def reset(self):
+        """Forget the watermark and the known IDs, so that the next poll
+        returns all the records.
+        """
+        self._write_date = self._id = None
+        self._seen = set()
+        self._ids = None
+        self.save()
+
+    def save(self):
+        """Save the watermark (and the known IDs if deletions are tracked)
+        in the state file. Called automatically after each poll.
+        """
+        if not self._state_file:
+            return
+        state = {
+            "write_date": self._write_date,
+            "id": self._id,
+            "seen_ids": sorted(self._seen),
+        }
+        if self._track_deletions and self._ids is not None:
+            state["ids"] = sorted(self._ids)
+        tmp_file = "%s.tmp" % self._state_file
+        with open(tmp_file, "w") as file_:
+            json.dump(state, file_)
+        # Replace the previous state atomically
+        getattr(os, "replace", os.rename)(tmp_file, self._state_file)
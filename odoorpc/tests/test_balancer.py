@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+import json
+import sys
+import threading
+
+import odoorpc
+from odoorpc.rpc.balancer import Balancer, parse_endpoints
+
+# Python 2
+if sys.version_info[0] < 3:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from urllib2 import URLError
+# Python >= 3
+else:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from urllib.error import URLError
+
+
+class Connector(object):
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+
+
+class VersionHandler(BaseHTTPRequestHandler):
+    """Answer the requests detecting the version of the server."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        result = {"server_version": "16.0"}
+        body = json.dumps({"jsonrpc": "2.0", "id": 1, "result": result})
+        body = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestBalancer(unittest.TestCase):
+    def setUp(self):
+        self.balancer = Balancer(
+            [Connector("host1", 8069), Connector("host2", 8069)], eject_time=60
+        )
+
+    def test_parse_endpoints(self):
+        self.assertEqual(
+            parse_endpoints("host1:8070, host2", 8069),
+            [("host1", 8070), ("host2", 8069)],
+        )
+        self.assertEqual(
+            parse_endpoints(["host1", ("host2", "8070"), "[::1]:8071"], 8069),
+            [("host1", 8069), ("host2", 8070), ("::1", 8071)],
+        )
+
+    def test_balancer_least_pending(self):
+        endpoint1 = self.balancer.acquire()
+        endpoint2 = self.balancer.acquire()
+        self.assertIsNot(endpoint1, endpoint2)
+        self.balancer.release(endpoint1)
+        self.assertIs(self.balancer.acquire(), endpoint1)
+
+    def test_balancer_ejection(self):
+        endpoint = self.balancer.acquire()
+        self.balancer.release(endpoint, URLError("refused"))
+        other = [e for e in self.balancer.endpoints if e is not endpoint][0]
+        for _i in range(3):
+            self.assertIs(self.balancer.acquire(), other)
+        stats = self.balancer.stats
+        self.assertEqual([s["ejected"] for s in stats].count(True), 1)
+        # Not a server failure
+        self.balancer.release(other, ValueError())
+        self.assertEqual(other.errors, 0)
+
+    def test_balancer_affinity(self):
+        endpoint = self.balancer.acquire(affinity=True)
+        self.balancer.release(endpoint)
+        for _i in range(3):
+            self.assertIs(self.balancer.acquire(affinity=True), endpoint)
+
+    def test_multi_hosts_version(self):
+        servers = [HTTPServer(("127.0.0.1", 0), VersionHandler) for _i in range(2)]
+        for server in servers:
+            thread = threading.Thread(target=server.serve_forever)
+            thread.daemon = True
+            thread.start()
+        hosts = ["127.0.0.1:%s" % server.server_address[1] for server in servers]
+        try:
+            odoo = odoorpc.ODOO(hosts, protocol="jsonrpc+multi")
+            self.assertEqual(odoo.version, "16.0")
+        finally:
+            for server in servers:
+                server.shutdown()
+                server.server_close()
+        # The version is shared with other connectors to the same servers
+        odoo = odoorpc.ODOO(",".join(hosts), protocol="jsonrpc+multi")
+        self.assertEqual(odoo.version, "16.0")
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+import gzip
+import os
+import shutil
+import tempfile
+
+from odoorpc.rpc.cassette import ConnectorCassette
+from odoorpc.rpc.error import ConnectorError
+from odoorpc.rpc.jsonrpclib import Secret
+
+
+class Connector(object):
+    """Connector answering the number of requests received."""
+
+    host = "localhost"
+    port = 8069
+    ssl = False
+    version = "16.0"
+    timeout = 120
+    retry = None
+
+    def __init__(self):
+        self.requests = []
+
+    def proxy_json(self, url, params):
+        self.requests.append((url, params))
+        return {"jsonrpc": "2.0", "id": 1, "result": len(self.requests)}
+
+
+def login(password):
+    return {"service": "common", "method": "login", "args": ["db", "admin", password]}
+
+
+class TestCassette(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "cassette.jsonl.gz")
+        self.connector = Connector()
+        cassette = ConnectorCassette(self.path, self.connector)
+        self.assertEqual(cassette.version, "16.0")
+        cassette.proxy_json("/jsonrpc", login(Secret("password")))
+        cassette.proxy_json.web.webclient.version_info()
+        cassette.proxy_json("/jsonrpc", login(Secret("password")))
+        cassette.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_cassette_record(self):
+        self.assertEqual(len(self.connector.requests), 3)
+        with gzip.open(self.path, "rb") as file_:
+            data = file_.read().decode("utf-8")
+        self.assertEqual(len(data.splitlines()), 4)
+        self.assertNotIn("password", data)
+        self.assertIn(Secret.MASK, data)
+
+    def test_cassette_replay(self):
+        cassette = ConnectorCassette(self.path, mode="replay")
+        self.assertEqual(cassette.version, "16.0")
+        # Responses of the same request are served in the recorded order,
+        # secrets are not compared
+        result = cassette.proxy_json("/jsonrpc", login(Secret("other")))
+        self.assertEqual(result["result"], 1)
+        result = cassette.proxy_json("/web/webclient/version_info", {})
+        self.assertEqual(result["result"], 2)
+        for _i in range(2):
+            result = cassette.proxy_json("/jsonrpc", login(Secret("other")))
+            self.assertEqual(result["result"], 3)
+        self.assertRaises(
+            ConnectorError, cassette.proxy_json, "/jsonrpc", login("not-secret")
+        )
+        self.assertRaises(ConnectorError, getattr, cassette, "proxy_http")
+
+    def test_cassette_wrong_mode(self):
+        self.assertRaises(ValueError, ConnectorCassette, self.path, mode="play")
+        self.assertRaises(ValueError, ConnectorCassette, self.path, mode="record")
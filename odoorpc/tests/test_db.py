@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
 
+import os
+import shutil
+import sys
+import tempfile
 import zipfile
 from datetime import datetime
 
@@ -7,6 +11,13 @@ import odoorpc
 from odoorpc.tests import BaseTestCase
 from odoorpc.tools import v
 
+# Python 2
+if sys.version_info[0] < 3:
+    from urllib2 import HTTPCookieProcessor, build_opener
+# Python >= 3
+else:
+    from urllib.request import HTTPCookieProcessor, build_opener
+
 
 class TestDB(BaseTestCase):
     def setUp(self):
@@ -183,6 +194,81 @@ class TestDB(BaseTestCase):
         self.assertNotIn(new_database, self.odoo.db.list())
         self.odoo.logout()
 
+    def test_db_dump_many(self):
+        self._skip_if_odoo_14()
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, "{db}.zip")
+            ops = self.odoo.db.dump_many(
+                self.env["super_pwd"], [self.env["db"], "wrong_db"], path
+            )
+            self.assertEqual([op.db for op in ops], [self.env["db"], "wrong_db"])
+            self.assertIsNone(ops[0].error)
+            self.assertEqual(ops[0].result, path.format(db=self.env["db"]))
+            self.assertIn("dump.sql", zipfile.ZipFile(ops[0].result).namelist())
+            self.assertIsInstance(ops[1].error, odoorpc.error.RPCError)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_db_dump_many_hidden_password(self):
+        self._skip_if_odoo_14()
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, "{db}.zip")
+            with self.assertLogs("odoorpc", level="DEBUG") as logs:
+                self.odoo.db.dump_many(self.env["super_pwd"], [self.env["db"]], path)
+            self.assertFalse(any(self.env["super_pwd"] in log for log in logs.output))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_db_connector_timeout_opener(self):
+        # The opener supplied by the user is kept by the connectors of
+        # operations having their own timeout
+        opener = build_opener(HTTPCookieProcessor())
+        odoo = odoorpc.ODOO(
+            self.env["host"],
+            protocol=self.env["protocol"],
+            port=self.env["port"],
+            version=self.env["version"],
+            opener=opener,
+        )
+        connector = odoo.db._get_connector(timeout=600)
+        self.assertIsNot(connector, odoo._connector)
+        self.assertEqual(connector.timeout, 600)
+        self.assertIs(connector._opener, opener)
+
+    def test_db_duplicate_drop_many(self):
+        date = datetime.strftime(datetime.today(), "%Y%m%d_%Hh%Mm%S")
+        new_databases = ["{}_{}_{}".format(self.env["db"], date, i) for i in range(2)]
+        self.databases.extend(new_databases)
+        ops = self.odoo.db.duplicate_many(
+            self.env["super_pwd"],
+            [(self.env["db"], new_database) for new_database in new_databases],
+            workers=2,
+            timeout=600,
+        )
+        self.assertEqual([op.error for op in ops], [None, None])
+        ops = self.odoo.db.drop_many(
+            self.env["super_pwd"], new_databases + ["wrong_database"]
+        )
+        self.assertEqual([op.result for op in ops], [True, True, False])
+
+    def test_db_template_pool(self):
+        pool = self.odoo.db.template_pool(
+            self.env["super_pwd"], self.env["db"], size=1, timeout=600
+        )
+        with pool:
+            db = pool.acquire()
+            self.assertTrue(db.startswith(pool.prefix))
+            self.odoo.login(db, self.env["user"], self.env["pwd"])
+            self.assertEqual(self.odoo.env.db, db)
+            self.odoo.logout()
+            pool.release(db)
+        self.assertFalse(
+            [db for db in self.odoo.db.list() if db.startswith(pool.prefix)]
+        )
+        self.assertRaises(odoorpc.error.InternalError, pool.acquire)
+
     def tearDown(self):
         """Clean up databases created during tests."""
         for db in self.databases:
@@ -69,11 +69,65 @@ class TestEnvironment(LoginTestCase):
         self.assertEqual(user.name, "Bob")
         self.assertNotIn(user, self.odoo.env.dirty)
 
+    def test_env_commit_unchanged(self):
+        self.odoo.config["auto_commit"] = False
+        user_id = self.user_obj.create(
+            {"name": "TestUnchanged", "login": "test_unchanged_%s" % time.time()}
+        )
+        user = self.user_obj.browse(user_id)
+        writes_avoided = self.odoo.env.writes_avoided
+        user.name = user.name
+        user.groups_id = user.groups_id
+        self.odoo.env.commit()
+        self.assertEqual(self.odoo.env.writes_avoided, writes_avoided + 1)
+        self.assertNotIn(user, self.odoo.env.dirty)
+        user.name = "Bob"
+        self.odoo.env.commit()
+        self.assertEqual(self.odoo.env.writes_avoided, writes_avoided + 1)
+        self.assertEqual(user.read(["name"])[0]["name"], "Bob")
+
+    def test_env_commit_deferred(self):
+        self.odoo.config["auto_commit"] = "deferred"
+        try:
+            logins = ["test_deferred_%s_%s" % (i, time.time()) for i in range(3)]
+            user_ids = [
+                self.user_obj.create({"name": "TestDeferred", "login": login})
+                for login in logins
+            ]
+            with self.odoo.env as env:
+                for user in env["res.users"].browse(user_ids):
+                    user.name = "Bob"
+                self.assertEqual(len(env._deferred.records), 3)
+                data = self.user_obj.read(user_ids, ["name"])
+                self.assertEqual({row["name"] for row in data}, {"TestDeferred"})
+            self.assertFalse(self.odoo.env._deferred.records)
+            data = self.user_obj.read(user_ids, ["name"])
+            self.assertEqual({row["name"] for row in data}, {"Bob"})
+        finally:
+            self.odoo.config["auto_commit"] = True
+
     def test_env_ref(self):
         record = self.odoo.env.ref("base.lang_en")
         self.assertIsInstance(record, Model)
         self.assertEqual(record._name, "res.lang")
         self.assertEqual(record.code, "en_US")
+        self.assertIn("base.lang_en", self.odoo.env._xmlids)
+        self.odoo.env.invalidate()
+        self.assertNotIn("base.lang_en", self.odoo.env._xmlids)
+
+    def test_env_refs(self):
+        records = self.odoo.env.refs(
+            ["base.lang_en", "base.main_company", "base.lang_en"]
+        )
+        self.assertEqual(
+            [record._name for record in records],
+            ["res.lang", "res.company", "res.lang"],
+        )
+        self.assertEqual(records[0].code, "en_US")
+        self.assertEqual(records[0], self.odoo.env.ref("base.lang_en"))
+        self.assertRaises(
+            ValueError, self.odoo.env.refs, ["base.lang_en", "base.does_not_exist"]
+        )
 
     def test_env_contains(self):
         self.assertIn("res.partner", self.odoo.env)
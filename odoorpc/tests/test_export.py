@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import tempfile
+
+import odoorpc.export
+from odoorpc.tests import LoginTestCase
+
+
+class TestExport(LoginTestCase):
+    def setUp(self):
+        LoginTestCase.setUp(self)
+        self.file_path = tempfile.mkstemp(suffix=".jsonl", prefix="odoorpc_")[1]
+
+    def tearDown(self):
+        os.remove(self.file_path)
+
+    def test_export(self):
+        ids = self.odoo.env["res.partner"].search([], order="id")
+        count = odoorpc.export.export(
+            self.odoo,
+            "res.partner",
+            self.file_path,
+            fields=["name"],
+            processes=2,
+            partitions=3,
+            page_size=5,
+        )
+        self.assertEqual(count, len(ids))
+        with open(self.file_path) as file_:
+            data = [json.loads(line) for line in file_]
+        self.assertEqual([d["id"] for d in data], ids)
+        self.assertEqual(sorted(data[0]), ["id", "name"])
+        self.assertFalse(os.path.exists("%s.0.part" % self.file_path))
+
+    def test_export_no_record(self):
+        count = odoorpc.export.export(
+            self.odoo, "res.partner", self.file_path, domain=[("id", "=", 0)]
+        )
+        self.assertEqual(count, 0)
+        with open(self.file_path) as file_:
+            self.assertEqual(file_.read(), "")
+
+    def test_export_partitions(self):
+        ranges = odoorpc.export._get_partitions([1, 2, 5, 8, 9], 2)
+        self.assertEqual(ranges, [(1, 5), (8, 9)])
+        ranges = odoorpc.export._get_partitions([1, 2], 4)
+        self.assertEqual(ranges, [(1, 1), (2, 2)])
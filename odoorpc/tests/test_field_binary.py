@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
 import base64
+import os
+import tempfile
 
 from odoorpc.tests import LoginTestCase
 from odoorpc.tools import v
@@ -60,3 +62,46 @@ class TestFieldBinary(LoginTestCase):
             data = self.user.read(["image_1920"])[0]
             self.assertEqual(data["image_1920"], backup)
             self.assertEqual(self.user.image_1920, backup)
+
+    def test_field_binary_lazy(self):
+        if v(self.odoo.version)[0] < 11:
+            self.skipTest("'icon_image' field is available from Odoo >= 11")
+        base = self.odoo.env.ref("base.module_base")
+        self.assertIsNone(base._values["icon_image"].get(base.id))
+        img = base.icon_image
+        self.assertEqual(base._values["icon_image"][base.id], img)
+
+    def test_field_binary_lazy_iterated(self):
+        if v(self.odoo.version)[0] < 11:
+            self.skipTest("'icon_image' field is available from Odoo >= 11")
+        module_obj = self.odoo.env["ir.module.module"]
+        modules = module_obj.browse(module_obj.search([], limit=3))
+        module = list(modules)[0]
+        module.icon_image
+        # Contents are fetched for all the records iterated
+        for id_ in modules.ids:
+            self.assertIsNotNone(modules._values["icon_image"].get(id_))
+
+    def test_field_binary_read_binary(self):
+        if v(self.odoo.version)[0] < 11:
+            self.skipTest("'icon_image' field is available from Odoo >= 11")
+        base = self.odoo.env.ref("base.module_base")
+        content = base.read_binary("icon_image")
+        self.assertIsNone(base._values["icon_image"].get(base.id))
+        self.assertEqual(content, base64.b64decode(base.icon_image.encode("ascii")))
+
+    def test_field_binary_save_binary(self):
+        if v(self.odoo.version)[0] < 11:
+            self.skipTest("'icon_image' field is available from Odoo >= 11")
+        base = self.odoo.env.ref("base.module_base")
+        path = tempfile.mkstemp(suffix=".png", prefix="odoorpc_")[1]
+        try:
+            base.save_binary("icon_image", path)
+            with open(path, "rb") as file_:
+                content = file_.read()
+        finally:
+            os.remove(path)
+        self.assertEqual(content, base64.b64decode(base.icon_image.encode("ascii")))
+
+    def test_field_binary_open_binary_wrong_field(self):
+        self.assertRaises(ValueError, self.user.open_binary, "name")
@@ -249,3 +249,39 @@ class TestFieldMany2many(LoginTestCase):
         group_ids = [grp.id for grp in self._get_user_groups(user)]
         self.assertNotIn(groups.ids[0], group_ids)
         self.assertNotIn(groups.ids[1], group_ids)
+
+    def test_field_many2many_write_iadd_isub_merged(self):
+        self.odoo.config["auto_commit"] = False
+        try:
+            user = self.user_obj.browse(self.u1_id)
+            group_ids = self._get_user_groups(user).ids
+            self._iadd_user_groups(user, [self.g1_id, self.g2_id])
+            self._isub_user_groups(user, self.g1_id)
+            self._iadd_user_groups(user, self.g1_id)
+            self._isub_user_groups(user, self.g2_id)
+            # One command per group, or a single (6, 0, IDS) if shorter
+            commands = user._values_to_write[self.groups_field][user.id]
+            self.assertLessEqual(len(commands), 2)
+            self.odoo.env.commit()
+        finally:
+            self.odoo.config["auto_commit"] = True
+        expected = [id_ for id_ in group_ids if id_ != self.g2_id]
+        self.assertEqual(sorted(self._read_user_groups(user)), sorted(expected))
+        self.assertEqual(sorted(self._get_user_groups(user).ids), sorted(expected))
+
+    def test_field_many2many_write_create_iadd(self):
+        self.odoo.config["auto_commit"] = False
+        try:
+            user = self.user_obj.browse(self.u0_id)
+            self._set_user_groups(user, [(0, 0, {"name": "Group new"})])
+            self._iadd_user_groups(user, self.g1_id)
+            # The create command is kept
+            commands = user._values_to_write[self.groups_field][user.id]
+            self.assertEqual(commands[0], (0, 0, {"name": "Group new"}))
+            self.odoo.env.commit()
+        finally:
+            self.odoo.config["auto_commit"] = True
+        group_ids = self._read_user_groups(user)
+        self.assertIn(self.g1_id, group_ids)
+        names = [data["name"] for data in self.group_obj.read(group_ids, ["name"])]
+        self.assertIn("Group new", names)
@@ -72,13 +72,50 @@ class TestInit(BaseTestCase):
         )
 
     def test_init_wrong_port(self):
-        self.assertRaises(
-            URLError,
-            odoorpc.ODOO,
-            self.env["host"],
-            self.env["protocol"],
-            65000,
+        # No request is sent until the server version is required
+        odoo = odoorpc.ODOO(self.env["host"], self.env["protocol"], 65000)
+        self.assertRaises(URLError, getattr, odoo, "version")
+
+    def test_init_multi(self):
+        host = "{0}:{1},{0}:{1}".format(self.env["host"], self.env["port"])
+        protocol = "jsonrpc+multi"
+        if "ssl" in self.env["protocol"]:
+            protocol = "jsonrpc+ssl+multi"
+        odoo = odoorpc.ODOO(host, protocol)
+        odoo.login(self.env["db"], self.env["user"], self.env["pwd"])
+        for _i in range(4):
+            odoo.env["res.partner"].search([])
+        stats = odoo._connector.balancer.stats
+        self.assertEqual(len(stats), 2)
+        self.assertTrue(all(s["requests"] for s in stats))
+
+    def test_init_replicas(self):
+        replicas = "{0}:{1}".format(self.env["host"], self.env["port"])
+        odoo = odoorpc.ODOO(
+            self.env["host"], self.env["protocol"], self.env["port"], replicas=replicas
         )
+        odoo.login(self.env["db"], self.env["user"], self.env["pwd"])
+        partner_obj = odoo.env["res.partner"]
+        # Read-only methods are sent to the replicas
+        requests = odoo._replica_connector.balancer.stats[0]["requests"]
+        partner_ids = partner_obj.search([])
+        stats = odoo._replica_connector.balancer.stats
+        self.assertEqual(stats[0]["requests"], requests + 1)
+        # Except after a change on the same model
+        odoo.config["read_your_writes"] = 60
+        partner_obj.write(partner_ids[:1], {"comment": "replicas"})
+        partner_obj.search([])
+        stats = odoo._replica_connector.balancer.stats
+        self.assertEqual(stats[0]["requests"], requests + 1)
+
+    def test_init_version_detection(self):
+        odoo = odoorpc.ODOO(self.env["host"], self.env["protocol"], self.env["port"])
+        self.assertIsNone(odoo._connector._version)
+        self.assertEqual(odoo.version, self.odoo.version)
+        # Version shared with other instances
+        other = odoorpc.ODOO(self.env["host"], self.env["protocol"], self.env["port"])
+        other._connector._proxy_json = None  # Any request would fail
+        self.assertEqual(other.version, odoo.version)
 
     def test_init_wrong_port_as_string(self):
         self.assertRaises(
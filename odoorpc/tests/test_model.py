@@ -86,6 +86,16 @@ class TestModel(LoginTestCase):
         product_ids = Product.search([])
         self.assertNotIn(product_id, product_ids)
 
+    def test_model_with_context_cached(self):
+        Product = self.odoo.env["product.product"]
+        Product_fr = Product.with_context(lang="fr_FR")
+        self.assertIs(Product.with_context(lang="fr_FR"), Product_fr)
+        self.assertIsNot(Product.with_context(lang="en_US"), Product_fr)
+        self.assertIs(Product.with_env(Product.env), Product)
+        # Classes are derived from the one generated by the environment
+        self.assertTrue(issubclass(Product_fr.with_context(lang="en_US"), Product))
+        self.assertEqual(Product_fr.env.lang, "fr_FR")
+
     def test_record_getitem_field(self):
         partner = self.partner_obj.browse(1)
         self.assertEqual(partner["id"], 1)
@@ -148,3 +158,79 @@ class TestModel(LoginTestCase):
             partner.display_name
         except Exception as exc:
             self.fail(exc)
+
+    def test_record_values_storage(self):
+        partner = self.partner_obj.browse(1)
+        # Values of relational fields are not fetched, and no field has
+        # been updated yet
+        self.assertNotIn("child_ids", partner._values)
+        self.assertEqual(partner._values_to_write, {})
+        partner.child_ids
+        self.assertIn("child_ids", partner._values)
+        self.assertRaises(AttributeError, setattr, partner, "foo", 42)
+
+    def test_record_iter_dirty(self):
+        self.odoo.config["auto_commit"] = False
+        partners = self.partner_obj.browse([self.p1_id, self.p2_id])
+        for partner in partners:
+            partner.name = "Child %s (updated)" % partner.id
+        del partner
+        import gc
+
+        gc.collect()
+        self.odoo.env.commit()
+        self.odoo.config["auto_commit"] = True
+        data = self.partner_obj.read([self.p1_id, self.p2_id], ["name"])
+        self.assertEqual(
+            [row["name"] for row in data],
+            ["Child %s (updated)" % id_ for id_ in [self.p1_id, self.p2_id]],
+        )
+
+    def test_model_aggregate(self):
+        self.partner_obj.write([self.p1_id, self.p2_id], {"parent_id": self.p0_id})
+        groups = self.partner_obj.aggregate(
+            [("parent_id", "=", self.p0_id)],
+            groupby=["parent_id"],
+            measures={"color": "max"},
+        )
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(groups[0].parent_id[0], self.p0_id)
+        self.assertEqual(groups[0].count, 2)
+        self.assertIn("color", groups[0]._fields)
+        groups = self.partner_obj.aggregate([("id", "=", self.p0_id)])
+        self.assertEqual(groups[0].count, 1)
+
+    def test_model_stream_search_read(self):
+        ids = [self.p0_id, self.p1_id, self.p2_id]
+        domain = [("id", "in", ids)]
+        data = self.partner_obj.search_read(domain, ["name"], order="id")
+        stream = self.partner_obj.stream_search_read(domain, ["name"], order="id")
+        self.assertEqual(next(stream), data[0])
+        self.assertEqual(list(stream), data[1:])
+        stream = self.partner_obj.stream_search_read(domain, ["name"], limit=1)
+        self.assertEqual(len(list(stream)), 1)
+        stream = self.partner_obj.stream_search_read([("wrong_field", "=", 1)])
+        self.assertRaises(error.RPCError, list, stream)
+
+    def test_record_mapped_filtered_sorted(self):
+        self.partner_obj.write([self.p1_id, self.p2_id], {"parent_id": self.p0_id})
+        partners = self.partner_obj.browse([self.p2_id, self.p1_id, self.p0_id])
+        self.assertEqual(partners.mapped("name"), ["Child 2", "Child 1", "Parent"])
+        self.assertEqual(partners.mapped("parent_id").ids, [self.p0_id])
+        self.assertEqual(partners.mapped("parent_id.name"), ["Parent"])
+        self.assertEqual(
+            partners.mapped(lambda p: p.name.upper()), ["CHILD 2", "CHILD 1", "PARENT"]
+        )
+        self.assertEqual(partners.filtered("parent_id").ids, [self.p2_id, self.p1_id])
+        self.assertEqual(
+            partners.filtered(lambda p: p.name == "Parent").ids, [self.p0_id]
+        )
+        self.assertEqual(
+            partners.sorted("name").ids, [self.p1_id, self.p2_id, self.p0_id]
+        )
+        self.assertEqual(
+            partners.sorted("parent_id.name", reverse=True).ids,
+            [self.p2_id, self.p1_id, self.p0_id],
+        )
+        self.assertRaises(ValueError, partners.mapped, "name.foo")
+        self.assertRaises(ValueError, partners.filtered, "foo")
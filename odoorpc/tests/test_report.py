@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
+import os
+import shutil
 import tempfile
 
 from odoorpc.tests import LoginTestCase
@@ -13,15 +15,48 @@ class TestReport(LoginTestCase):
         if v(self.odoo.version)[0] < 11:
             report_name = "preview.report"
         ids = self.odoo.env[model].search([])[:20]
+        report = self.odoo.report.download(report_name, ids)
+        with tempfile.TemporaryFile(mode="wb", suffix=".pdf") as file_:
+            file_.write(report.read())
+
+    def test_report_download_many(self):
+        report_name = "web.preview_internalreport"
+        model = "res.company"
+        if v(self.odoo.version)[0] < 11:
+            report_name = "preview.report"
+        ids = self.odoo.env[model].search([])[:3]
+        tmp_dir = tempfile.mkdtemp()
         try:
-            report = self.odoo.report.download(report_name, ids)
-            with tempfile.TemporaryFile(mode="wb", suffix=".pdf") as file_:
-                file_.write(report.read())
-        except NotImplementedError:
-            self.skipTest(
-                "Report downloading is not supported in version %s"
-                % (self.odoo.version)
-            )
+            path = os.path.join(tmp_dir, "report_{id}.pdf")
+            paths = self.odoo.report.download_many(report_name, ids, path, workers=2)
+            self.assertEqual(paths, [path.format(id=id_) for id_ in ids])
+            for path in paths:
+                self.assertTrue(os.path.getsize(path))
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def test_report_download_html_session_expired(self):
+        if v(self.odoo.version)[0] < 14:
+            self.skipTest("Reports are downloaded through HTTP from Odoo >= 14")
+        ids = self.odoo.env["res.company"].search([])[:1]
+        self.odoo._check_web_session()
+        # The login page returned for the expired session is not a report
+        self.odoo._connector._cookie_jar.clear()
+        response = self.odoo.report._open(
+            "web.preview_internalreport", ids, "qweb-html", None, self.odoo.env.context
+        )
+        try:
+            self.assertNotIn("/web/login", response.geturl())
+        finally:
+            response.close()
+
+    def test_report_cache(self):
+        self.odoo.report.invalidate()
+        res = self.odoo.report.list()
+        self.assertIsNotNone(self.odoo.report._reports)
+        self.assertEqual(self.odoo.report.list(), res)
+        self.odoo.report.invalidate()
+        self.assertIsNone(self.odoo.report._reports)
 
     def test_report_download_wrong_report_name(self):
         self.assertRaises(ValueError, self.odoo.report.download, "wrong_report", [1])
@@ -36,3 +71,12 @@ class TestReport(LoginTestCase):
         self.assertTrue(
             any("account.report_invoice" in data["report_name"] for data in res[model])
         )
+
+    def test_report_list_all_actions(self):
+        report_model = "ir.actions.report"
+        if v(self.odoo.version)[0] < 11:
+            report_model = "ir.actions.report.xml"
+        # Actions sharing the same report name are all listed
+        count = self.odoo.env[report_model].search_count([])
+        res = self.odoo.report.list()
+        self.assertEqual(sum(len(reports) for reports in res.values()), count)
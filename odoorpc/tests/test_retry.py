@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+import sys
+
+from odoorpc.rpc.retry import RetryPolicy
+
+# Python 2
+if sys.version_info[0] < 3:
+    from urllib2 import HTTPError, URLError
+# Python >= 3
+else:
+    from urllib.error import HTTPError, URLError
+
+READ = {
+    "service": "object",
+    "method": "execute_kw",
+    "args": ["db", 2, "admin", "res.partner", "read", [[1]]],
+}
+WRITE = {
+    "service": "object",
+    "method": "execute_kw",
+    "args": ["db", 2, "admin", "res.partner", "write", [[1], {}]],
+}
+CONCURRENCY_ERROR = {
+    "error": {
+        "code": 200,
+        "message": "Odoo Server Error",
+        "data": {
+            "name": "psycopg2.errors.SerializationFailure",
+            "message": "could not serialize access due to concurrent update",
+        },
+    }
+}
+
+
+class TestRetry(unittest.TestCase):
+    def setUp(self):
+        self.policy = RetryPolicy(max_retries=2, backoff=0)
+
+    def _request(self, *responses):
+        """Return a function sending a fake request, raising or returning
+        `responses` in turn.
+        """
+        responses = list(responses)
+
+        def request(url, params):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        return request
+
+    def test_retry_is_safe(self):
+        self.assertTrue(self.policy.is_safe("/jsonrpc", READ))
+        self.assertFalse(self.policy.is_safe("/jsonrpc", WRITE))
+        self.assertTrue(
+            self.policy.is_safe("/jsonrpc", {"service": "db", "method": "list"})
+        )
+        self.assertFalse(
+            self.policy.is_safe("/jsonrpc", {"service": "db", "method": "drop"})
+        )
+        self.assertTrue(self.policy.is_safe("/web/webclient/version_info", {}))
+
+    def test_retry_connection_error(self):
+        request = self._request(URLError("refused"), {"result": 42})
+        self.assertEqual(self.policy.call(request, "/jsonrpc", READ), {"result": 42})
+        counters = self.policy.counters
+        self.assertEqual(counters["attempts"], 1)
+        self.assertEqual(counters["connection"], 1)
+        self.assertEqual(counters["recovered"], 1)
+        # Unsafe methods are not sent again
+        request = self._request(URLError("refused"), {"result": 42})
+        self.assertRaises(URLError, self.policy.call, request, "/jsonrpc", WRITE)
+
+    def test_retry_http_error(self):
+        error = HTTPError("http://localhost/jsonrpc", 502, "Bad Gateway", {}, None)
+        request = self._request(error, error, error)
+        self.assertRaises(HTTPError, self.policy.call, request, "/jsonrpc", READ)
+        self.assertEqual(self.policy.counters["http"], 2)
+        self.assertEqual(self.policy.counters["exhausted"], 1)
+        error = HTTPError("http://localhost/jsonrpc", 404, "Not Found", {}, None)
+        request = self._request(error, {"result": 42})
+        self.assertRaises(HTTPError, self.policy.call, request, "/jsonrpc", READ)
+
+    def test_retry_concurrency_error(self):
+        request = self._request(CONCURRENCY_ERROR, {"result": True})
+        self.assertEqual(self.policy.call(request, "/jsonrpc", WRITE), {"result": True})
+        self.assertEqual(self.policy.counters["concurrency"], 1)
+        request = self._request(*[CONCURRENCY_ERROR] * 3)
+        self.assertEqual(
+            self.policy.call(request, "/jsonrpc", WRITE), CONCURRENCY_ERROR
+        )
+        self.policy.reset()
+        self.assertEqual(self.policy.counters["concurrency"], 0)
+
+    def test_retry_delay(self):
+        policy = RetryPolicy(backoff=1, max_backoff=5)
+        self.assertTrue(0 <= policy.delay(1) <= 2)
+        self.assertTrue(0 <= policy.delay(10) <= 5)
@@ -5,6 +5,7 @@ import tempfile
 
 import odoorpc
 from odoorpc.tests import LoginTestCase
+from odoorpc.tools import v
 
 
 class TestSession(LoginTestCase):
@@ -40,6 +41,37 @@ class TestSession(LoginTestCase):
         self.assertEqual(self.odoo.env.uid, odoo.env.uid)
         odoorpc.ODOO.remove(self.session_name, rc_file=self.file_path)
 
+    def test_session_odoo_load_warm_start(self):
+        self.odoo.save(self.session_name, rc_file=self.file_path, warm_start=True)
+        odoo = odoorpc.ODOO.load(self.session_name, rc_file=self.file_path)
+        self.assertEqual(self.odoo.version, odoo.version)
+        self.assertEqual(self.odoo.env.db, odoo.env.db)
+        self.assertEqual(self.odoo.env.uid, odoo.env.uid)
+        self.assertEqual(self.odoo.env.context, odoo.env.context)
+        self.assertEqual(odoo.env.user.login, self.env["user"])
+        odoorpc.ODOO.remove(self.session_name, rc_file=self.file_path)
+
+    def test_session_odoo_load_warm_start_report(self):
+        self.odoo.save(self.session_name, rc_file=self.file_path, warm_start=True)
+        odoo = odoorpc.ODOO.load(self.session_name, rc_file=self.file_path)
+        report_name = "web.preview_internalreport"
+        if v(odoo.version)[0] < 11:
+            report_name = "preview.report"
+        ids = odoo.env["res.company"].search([])[:1]
+        report = odoo.report.download(report_name, ids)
+        self.assertTrue(report.read())
+        report.close()
+        odoorpc.ODOO.remove(self.session_name, rc_file=self.file_path)
+
+    def test_session_odoo_load_warm_start_renewed(self):
+        self.odoo.save(self.session_name, rc_file=self.file_path, warm_start=True)
+        odoo = odoorpc.ODOO.load(self.session_name, rc_file=self.file_path)
+        # Simulate a stale user ID, the session is renewed by the first query
+        odoo.env._uid = 999999
+        self.assertEqual(odoo.env.user.login, self.env["user"])
+        self.assertEqual(odoo.env.uid, self.odoo.env.uid)
+        odoorpc.ODOO.remove(self.session_name, rc_file=self.file_path)
+
     def test_session_get(self):
         self.odoo.save(self.session_name, rc_file=self.file_path)
         data = {
@@ -56,6 +88,14 @@ class TestSession(LoginTestCase):
         self.assertEqual(data, result)
         odoorpc.ODOO.remove(self.session_name, rc_file=self.file_path)
 
+    def test_session_get_cold_after_warm_start(self):
+        self.odoo.save(self.session_name, rc_file=self.file_path, warm_start=True)
+        self.odoo.save(self.session_name, rc_file=self.file_path)
+        result = odoorpc.session.get(self.session_name, rc_file=self.file_path)
+        for key in ("uid", "context", "version"):
+            self.assertNotIn(key, result)
+        odoorpc.ODOO.remove(self.session_name, rc_file=self.file_path)
+
     def test_session_get_all(self):
         self.odoo.save(self.session_name, rc_file=self.file_path)
         data = {
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+import io
+import json
+
+from odoorpc.rpc.error import ConnectorError
+from odoorpc.rpc.jsonrpclib import JSONStream
+
+ROWS = [
+    {"id": i, "name": "Partner %s \u00e9" % i, "amount": i * 1.5} for i in range(100)
+]
+
+
+def response(data):
+    return io.BytesIO(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+
+class TestStream(unittest.TestCase):
+    def test_stream_chunks(self):
+        data = {"jsonrpc": "2.0", "id": 1, "result": ROWS}
+        # Values split between chunks, including multi-bytes characters
+        for chunk_size in (1, 7, 1024):
+            stream = JSONStream(response(data), chunk_size=chunk_size)
+            self.assertEqual(list(stream), ROWS)
+
+    def test_stream_result_first(self):
+        data = json.dumps(ROWS[:2])
+        stream = JSONStream(io.BytesIO(('{"result": %s, "id": 1}' % data).encode()))
+        self.assertEqual(list(stream), ROWS[:2])
+
+    def test_stream_empty(self):
+        stream = JSONStream(response({"jsonrpc": "2.0", "id": 1, "result": []}))
+        self.assertEqual(list(stream), [])
+
+    def test_stream_error(self):
+        error = {"code": 200, "data": {"message": "Invalid field"}}
+        stream = JSONStream(response({"jsonrpc": "2.0", "id": 1, "error": error}))
+        try:
+            list(stream)
+        except ConnectorError as exc:
+            self.assertEqual(exc.message, "Invalid field")
+            self.assertEqual(exc.odoo_traceback, error)
+        else:
+            self.fail("No error raised")
+
+    def test_stream_invalid(self):
+        stream = JSONStream(io.BytesIO(b'{"result": [1, 2'))
+        self.assertRaises(ValueError, list, stream)
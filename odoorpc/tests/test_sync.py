@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+import operator
+import os
+import tempfile
+
+import odoorpc.sync
+from odoorpc.tests import LoginTestCase
+
+OPERATORS = {
+    ">=": operator.ge,
+    "not in": lambda value, values: value not in values,
+}
+
+
+class StandInModel(object):
+    """Model whose records are stored with a `write_date` in microseconds,
+    sorted on it but returned truncated to the second like `Odoo` does.
+    """
+
+    def __init__(self, records):
+        self.records = records
+
+    def _match(self, record, domain):
+        term = domain.pop(0)
+        if term == "|":
+            return self._match(record, domain) | self._match(record, domain)
+        if term == "&":
+            return self._match(record, domain) & self._match(record, domain)
+        field, op, value = term
+        return OPERATORS[op](record[field], value)
+
+    def _filter(self, record, domain):
+        result = True
+        while domain:
+            result &= self._match(record, domain)
+        return result
+
+    def search_read(self, domain, fields, limit=None, order=None):
+        records = [
+            record
+            for record in sorted(self.records, key=lambda r: (r["write_date"], r["id"]))
+            if self._filter(record, list(domain))
+        ]
+        return [
+            {"id": record["id"], "write_date": record["write_date"][:19]}
+            for record in records[:limit]
+        ]
+
+
+class TestPoller(unittest.TestCase):
+    def test_poller_same_second(self):
+        # IDs not in write order within the same second
+        model = StandInModel(
+            [
+                {"id": 10, "write_date": "2024-01-01 10:00:00.100000"},
+                {"id": 5, "write_date": "2024-01-01 10:00:00.200000"},
+                {"id": 7, "write_date": "2024-01-01 10:00:00.300000"},
+                {"id": 1, "write_date": "2024-01-01 10:00:01.000000"},
+            ]
+        )
+        poller = odoorpc.sync.Poller(model, page_size=1)
+        self.assertEqual([d["id"] for d in poller.poll()], [10, 5, 7, 1])
+        self.assertEqual(poller.watermark, ("2024-01-01 10:00:01", 1))
+        self.assertEqual(list(poller.poll()), [])
+        model.records.append({"id": 2, "write_date": "2024-01-01 10:00:01.500000"})
+        self.assertEqual([d["id"] for d in poller.poll()], [2])
+
+
+class TestSync(LoginTestCase):
+    def setUp(self):
+        LoginTestCase.setUp(self)
+        self.partner_obj = self.odoo.env["res.partner"]
+        self.file_path = tempfile.mkstemp(suffix=".json", prefix="odoorpc_")[1]
+        os.remove(self.file_path)
+
+    def tearDown(self):
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
+
+    def test_poller_poll(self):
+        poller = odoorpc.sync.Poller(self.partner_obj, fields=["name"], page_size=2)
+        data = list(poller.poll())
+        self.assertEqual(
+            len(data), self.partner_obj.search_count([]), "All records at first poll"
+        )
+        self.assertEqual(poller.watermark, (data[-1]["write_date"], data[-1]["id"]))
+        self.assertEqual(list(poller.poll()), [])
+        partner_id = self.partner_obj.create({"name": "Poller"})
+        self.assertEqual([d["id"] for d in poller.poll()], [partner_id])
+        self.partner_obj.browse(partner_id).name = "Poller updated"
+        self.assertEqual([d["name"] for d in poller.poll()], ["Poller updated"])
+
+    def test_poller_state_file(self):
+        poller = odoorpc.sync.Poller(
+            self.partner_obj, fields=["name"], state_file=self.file_path
+        )
+        list(poller.poll())
+        poller2 = odoorpc.sync.Poller(
+            self.partner_obj, fields=["name"], state_file=self.file_path
+        )
+        self.assertEqual(poller2.watermark, poller.watermark)
+        self.assertEqual(list(poller2.poll()), [])
+
+    def test_poller_deleted(self):
+        poller = odoorpc.sync.Poller(
+            self.partner_obj,
+            fields=["name"],
+            domain=[("name", "like", "Poller")],
+            track_deletions=True,
+        )
+        partner_id = self.partner_obj.create({"name": "Poller deleted"})
+        self.assertEqual(poller.deleted(), [])
+        self.partner_obj.unlink([partner_id])
+        self.assertEqual(poller.deleted(), [partner_id])
+        poller = odoorpc.sync.Poller(self.partner_obj)
+        self.assertRaises(ValueError, poller.deleted)
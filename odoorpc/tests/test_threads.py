@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+import json
+import multiprocessing
+import os
+import pickle
+import sys
+import threading
+
+import odoorpc
+
+# Python 2
+if sys.version_info[0] < 3:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+# Python >= 3
+else:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+THREADS = 16
+ITERATIONS = 20
+FIELDS = {
+    "res.partner": {"name": {"type": "char", "string": "Name"}},
+    "res.country": {"code": {"type": "char", "string": "Code"}},
+    "res.company": {
+        "f0": {"type": "char", "string": "Field 0"},
+        "f1": {"type": "char", "string": "Field 1"},
+    },
+}
+
+
+class StandInServer(ThreadingMixIn, HTTPServer):
+    """Minimal `Odoo` stand-in answering the JSON-RPC requests sent by the
+    tests (login, `fields_get`, `search`, `read` and `write`).
+    """
+
+    daemon_threads = True
+    request_queue_size = 64
+
+    def __init__(self):
+        HTTPServer.__init__(self, ("127.0.0.1", 0), StandInHandler)
+        self.lock = threading.Lock()
+        self.calls = []
+        self.fail_writes = 0  # number of next writes to fail
+        self.data = {
+            "res.partner": {
+                id_: {"name": "Partner %s" % id_} for id_ in range(1, THREADS + 1)
+            },
+            "res.country": {1: {"code": "BE"}},
+            "res.company": {
+                id_: dict.fromkeys(FIELDS["res.company"], False)
+                for id_ in range(1, THREADS + 1)
+            },
+        }
+
+    def execute(self, model, method, args, kwargs):
+        with self.lock:
+            self.calls.append((model, method))
+            if method == "context_get":
+                return {"lang": "en_US", "tz": "Europe/Brussels"}
+            records = self.data[model]
+            if method == "fields_get":
+                return FIELDS[model]
+            if method == "search":
+                return sorted(records)
+            if method == "read":
+                fields = args[1] if len(args) > 1 else kwargs.get("fields")
+                return [
+                    dict(
+                        [("id", id_)]
+                        + [
+                            (name, records[id_][name])
+                            for name in fields or FIELDS[model]
+                        ]
+                    )
+                    for id_ in args[0]
+                ]
+            if method == "write":
+                if self.fail_writes:
+                    self.fail_writes -= 1
+                    raise ValueError("Write failed")
+                for id_ in args[0]:
+                    records[id_].update(args[1])
+                return True
+        raise ValueError("Method '%s' not supported" % method)
+
+
+def _read_names(records):
+    """Read the names of `records` from another process."""
+    return records.mapped("name")
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        params = json.loads(self.rfile.read(length).decode("utf-8"))["params"]
+        if params.get("service") == "common":
+            data = {"result": 2}
+        else:
+            args = params["args"]
+            if params["method"] == "execute_kw":
+                method_args = args[5]
+                kwargs = args[6] if len(args) > 6 else {}
+            else:
+                method_args, kwargs = args[5:], {}
+            try:
+                data = {
+                    "result": self.server.execute(args[3], args[4], method_args, kwargs)
+                }
+            except ValueError as exc:
+                error = {"message": str(exc)}
+                data = {"error": {"code": 200, "message": str(exc), "data": error}}
+        data.update(jsonrpc="2.0", id=1)
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestThreads(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer()
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.odoo = odoorpc.ODOO(
+            "127.0.0.1", port=self.server.server_address[1], version="16.0"
+        )
+        self.odoo.login("db", "admin", "admin")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _run(self, func):
+        errors = []
+
+        def target(index):
+            try:
+                func(index)
+            except Exception as exc:
+                errors.append(exc)
+
+        threads = [
+            threading.Thread(target=target, args=(index,)) for index in range(THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+
+    def test_threads_shared_odoo(self):
+        self.odoo.config["auto_commit"] = False
+        env = self.odoo.env
+        start = threading.Barrier(THREADS) if hasattr(threading, "Barrier") else None
+
+        def work(index):
+            if start:
+                start.wait()
+            partner_id = index + 1
+            for iteration in range(ITERATIONS):
+                partner = env["res.partner"].browse(partner_id)
+                country = env["res.country"].with_context(lang="fr_FR").browse(1)
+                self.assertEqual(country.code, "BE")
+                partner.name = "Partner %s/%s" % (partner_id, iteration)
+                # Only the current thread sees its own changes as dirty
+                self.assertEqual(list(env.dirty), [partner])
+                env.commit()
+                self.assertEqual(list(env.dirty), [])
+
+        self._run(work)
+        # Model classes have been generated once
+        self.assertEqual(self.server.calls.count(("res.partner", "fields_get")), 1)
+        self.assertEqual(self.server.calls.count(("res.country", "fields_get")), 1)
+        self.assertEqual(
+            sorted(self.server.data["res.partner"].items()),
+            [
+                (id_, {"name": "Partner %s/%s" % (id_, ITERATIONS - 1)})
+                for id_ in range(1, THREADS + 1)
+            ],
+        )
+        self.assertEqual(
+            self.server.calls.count(("res.partner", "write")), THREADS * ITERATIONS
+        )
+
+    def test_threads_deferred(self):
+        self.odoo.config["auto_commit"] = "deferred"
+        self.odoo.config["commit_size"] = THREADS
+        self.odoo.config["commit_delay"] = 0
+        env = self.odoo.env
+
+        def work(index):
+            partner = env["res.partner"].browse(index + 1)
+            for iteration in range(ITERATIONS):
+                partner.name = "Partner %s/%s" % (index + 1, iteration)
+
+        with env:
+            self._run(work)
+        self.assertEqual(
+            sorted(self.server.data["res.partner"].items()),
+            [
+                (id_, {"name": "Partner %s/%s" % (id_, ITERATIONS - 1)})
+                for id_ in range(1, THREADS + 1)
+            ],
+        )
+        # Changes of all threads written by batches
+        self.assertLessEqual(
+            self.server.calls.count(("res.partner", "write")),
+            THREADS * ITERATIONS // 2,
+        )
+        self.assertFalse(env._deferred.records)
+
+    def test_threads_deferred_updated_while_written(self):
+        self.odoo.config["auto_commit"] = "deferred"
+        self.odoo.config["commit_size"] = 0
+        self.odoo.config["commit_delay"] = 0
+        env = self.odoo.env
+        company = env["res.company"].browse(1)
+        field = company._columns["f0"]
+        unchanged = field.unchanged
+
+        def update(record, value):
+            # Another thread updating the record while it is written
+            if "f1" not in record._values_to_write:
+                record.f1 = "f1"
+            return unchanged(record, value)
+
+        field.unchanged = update
+        company.f0 = "f0"
+        env.commit()
+        self.assertEqual(self.server.data["res.company"][1], {"f0": "f0", "f1": False})
+        # The new change is written later
+        self.assertEqual(list(env._deferred.records), [company])
+        env.commit()
+        self.assertEqual(self.server.data["res.company"][1], {"f0": "f0", "f1": "f1"})
+
+    def test_threads_deferred_with_error(self):
+        self.odoo.config["auto_commit"] = "deferred"
+        env = self.odoo.env
+        try:
+            with env:
+                env["res.partner"].browse(1).name = "Partner 1/1"
+                raise ValueError("Failed")
+        except ValueError:
+            pass
+        # Changes of the block which failed are not written
+        self.assertEqual(self.server.data["res.partner"][1], {"name": "Partner 1"})
+        self.assertEqual(len(env._deferred.records), 1)
+
+    def test_threads_deferred_order(self):
+        self.odoo.config["auto_commit"] = "deferred"
+        self.odoo.config["commit_size"] = 0
+        self.odoo.config["commit_delay"] = 0
+        env = self.odoo.env
+        env["res.partner"].browse(3).name = "B"
+        env["res.partner"].browse(2).name = "A"
+        # Same values as the first record, but written after the second one
+        env["res.partner"].browse(2).name = "B"
+        env.commit()
+        self.assertEqual(self.server.data["res.partner"][2], {"name": "B"})
+
+    def test_threads_deferred_error(self):
+        self.odoo.config["auto_commit"] = "deferred"
+        env = self.odoo.env
+        partner = env["res.partner"].browse(1)
+        partner.name = "Partner 1/1"
+        self.server.fail_writes = 1
+        self.assertRaises(Exception, env.commit)
+        # The change not written is kept and written by the next commit
+        self.assertEqual(list(env._deferred.records), [partner])
+        env.commit()
+        self.assertEqual(self.server.data["res.partner"][1], {"name": "Partner 1/1"})
+
+    def test_pickle(self):
+        self.odoo.config["auto_commit"] = False
+        partners = self.odoo.env["res.partner"].browse([1, 2])
+        partners = partners.with_context(lang="fr_FR")
+        odoo, env, partners = pickle.loads(
+            pickle.dumps([self.odoo, self.odoo.env, partners])
+        )
+        self.assertIsNot(odoo, self.odoo)
+        self.assertIs(env, odoo.env)
+        self.assertFalse(odoo.config["auto_commit"])
+        self.assertEqual(env.uid, self.odoo.env.uid)
+        self.assertEqual(partners.ids, [1, 2])
+        self.assertEqual(partners.env.context["lang"], "fr_FR")
+        calls = len(self.server.calls)
+        self.assertEqual(partners.mapped("name"), ["Partner 1", "Partner 2"])
+        # Session restored without any login request
+        self.assertNotIn(("res.users", "context_get"), self.server.calls[calls:])
+
+    @unittest.skipIf(
+        not hasattr(multiprocessing, "get_context"), "'spawn' start method required"
+    )
+    def test_pickle_spawn(self):
+        partners = self.odoo.env["res.partner"].browse([1, 2])
+        pool = multiprocessing.get_context("spawn").Pool(1)
+        try:
+            result = pool.map(_read_names, [partners])
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEqual(result, [["Partner 1", "Partner 2"]])
+
+    @unittest.skipIf(not hasattr(os, "fork"), "os.fork() required")
+    def test_fork(self):
+        partner_obj = self.odoo.env["res.partner"]
+        opener = self.odoo._connector._opener
+        pid = os.fork()
+        if not pid:
+            # Child process: new connections, same session and model classes
+            status = 1
+            try:
+                status = int(
+                    self.odoo._connector._opener is opener
+                    or self.odoo.env["res.partner"] is not partner_obj
+                    or partner_obj.browse(1).name != "Partner 1"
+                )
+            finally:
+                os._exit(status)
+        self.assertEqual(os.waitpid(pid, 0)[1], 0)
+        self.assertEqual(self.server.calls.count(("res.partner", "fields_get")), 1)
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 
+import threading
+import time
+
 from odoorpc import tools
 from odoorpc.tests import BaseTestCase
 
@@ -36,3 +39,39 @@ class TestTools(BaseTestCase):
                 self.assertTrue(result)
             else:
                 self.assertFalse(result)
+
+    def test_single_flight(self):
+        flights = tools.SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        calls, results = [], []
+
+        def func(value):
+            calls.append(value)
+            started.set()
+            release.wait()
+            return {"value": value}
+
+        leader = threading.Thread(
+            target=lambda: results.append(flights.call("key", func, 1))
+        )
+        leader.start()
+        started.wait()
+        followers = [
+            threading.Thread(
+                target=lambda: results.append(flights.call("key", func, 2))
+            )
+            for _i in range(4)
+        ]
+        for thread in followers:
+            thread.start()
+        while flights.shared < 4:
+            time.sleep(0.01)
+        release.set()
+        for thread in [leader] + followers:
+            thread.join()
+        self.assertEqual(calls, [1])
+        self.assertEqual(results, [{"value": 1}] * 5)
+        # Each call gets its own copy of the result
+        self.assertEqual(len(set(id(result) for result in results)), 5)
+        # The key is released once the call is done
+        self.assertEqual(flights.call("key", func, 3), {"value": 3})
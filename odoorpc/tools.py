@@ -10,7 +10,9 @@ try:
     from collections.abc import MutableMapping
 except ImportError:  # Python 2.7 compatibility
     from collections import MutableMapping
+import copy
 import re
+import threading
 
 from .error import InternalError
 
@@ -40,9 +42,13 @@ class Config(MutableMapping):
         return self._options[key]
 
     def __setitem__(self, key, value):
-        """Handle ``timeout`` option to set the timeout on the connector."""
-        if key == "timeout":
-            self._odoo._connector.timeout = value
+        """Handle ``timeout`` and ``retry`` options to set them on the
+        connector.
+        """
+        if key in ("timeout", "retry"):
+            for connector in (self._odoo._connector, self._odoo._replica_connector):
+                if connector is not None:
+                    setattr(connector, key, value)
         self._options[key] = value
 
     def __delitem__(self, key):
@@ -61,6 +67,68 @@ class Config(MutableMapping):
         return self._options.__repr__()
 
 
+class _Flight(object):
+    """A call in progress of :class:`SingleFlight`."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.followers = 0
+        self.result = None
+        self.exc = None
+
+
+class SingleFlight(object):
+    """Execute only once identical calls made concurrently by several threads.
+
+    The first thread calling :func:`call` with a given `key` executes the
+    function, the others wait for its end and get a copy of its result (or
+    its exception). Used by :func:`ODOO.execute_kw <odoorpc.ODOO.execute_kw>`
+    to send only one request for identical read-only calls in progress.
+
+    >>> from odoorpc.tools import SingleFlight
+    >>> flights = SingleFlight()
+    >>> flights.call('key', sum, [1, 2])
+    3
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.shared = 0  # Calls which got the result of another one
+
+    def call(self, key, func, *args):
+        """Return the result of ``func(*args)``, or a copy of the result of
+        the call in progress with the same `key`.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.followers += 1
+                self.shared += 1
+        if not leader:
+            flight.done.wait()
+            if flight.exc is not None:
+                raise flight.exc
+            return copy.deepcopy(flight.result)
+        try:
+            result = func(*args)
+        except BaseException as exc:
+            flight.exc = exc
+            raise
+        finally:
+            # No other call can wait for this one once removed
+            with self._lock:
+                del self._flights[key]
+            if flight.exc is None and flight.followers:
+                # Followers get a copy of the result before the caller updates it
+                flight.result = copy.deepcopy(result)
+            flight.done.set()
+        return result
+
+
 def clean_version(version):
     """Clean a version string.
 